@@ -1,6 +1,8 @@
+import logging
 from typing import Annotated
 from datetime import timedelta, datetime
 import secrets
+import uuid
 
 from app.api.v1.core.models import Token, User
 from app.api.v1.core.schemas import (
@@ -8,18 +10,26 @@ from app.api.v1.core.schemas import (
     UserOutSchema,
     UserRegisterSchema,
 )
-from app.db_setup import get_db
+from app.db_setup import get_async_db, get_db
 from app.security import (
     create_database_token,
     get_current_token,
     hash_password,
+    hash_password_async,
+    invalidate_cached_token,
+    invalidate_cached_user,
+    verify_and_update,
     verify_password,
 )
+from app.uploads import save_profile_image
 from fastapi import APIRouter, Depends, Form, HTTPException, Response, status, UploadFile, File
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["auth"])
 
 
@@ -38,12 +48,16 @@ def login(
         .scalars()
         .first()
     )
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = verify_and_update(form_data.password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Upgrade hashes made with deprecated settings; committed with the token changes below
+    if new_hash:
+        user.hashed_password = new_hash
     
     # First revoke existing tokens
     db.execute(
@@ -53,6 +67,7 @@ def login(
         )
     )
     db.commit()
+    invalidate_cached_user(user.id)
     
     # Create new token
     access_token = create_database_token(user_id=user.id, db=db)
@@ -75,12 +90,16 @@ def login_alternate(
         .scalars()
         .first()
     )
-    if not user or not verify_password(password, user.hashed_password):
+    verified, new_hash = verify_and_update(password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Upgrade hashes made with deprecated settings; committed with the new token
+    if new_hash:
+        user.hashed_password = new_hash
     access_token = create_database_token(user_id=user.id, db=db)
     return {"access_token": access_token.token, "token_type": "bearer"}
 
@@ -92,6 +111,7 @@ def logout(
 ):
     db.execute(delete(Token).where(Token.token == current_token.token))
     db.commit()
+    invalidate_cached_token(current_token.token)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -102,64 +122,53 @@ async def register_user(
     password: str = Form(...),
     full_name: str = Form(None),
     profile_image: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserOutSchema:
     # Check if email already exists
-    if db.execute(select(User).where(User.email == email)).scalars().first():
+    if (await db.execute(select(User).where(User.email == email))).scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email is already registered",
         )
     
     # Check if username already exists
-    if db.execute(select(User).where(User.username == username)).scalars().first():
+    if (await db.execute(select(User).where(User.username == username))).scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username is already taken",
         )
     
+    # Store the profile image first, so an invalid upload is rejected before the account exists
+    user_id = uuid.uuid4()
+    image_url, image_variants = None, None
+    if profile_image:
+        try:
+            image_url, image_variants = await save_profile_image(profile_image, user_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            # Log error but don't fail the registration
+            logger.exception(f"Error saving profile image: {e}")
+    
     # Create new user
-    hashed_password = hash_password(password)
+    hashed_password = await hash_password_async(password)
     new_user = User(
+        id=user_id,
         username=username,
         email=email,
         full_name=full_name,
         hashed_password=hashed_password,
+        profile_image=image_url,
+        profile_image_variants=image_variants,
     )
 
     # Add user to database
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    # Handle profile image if provided
-    if profile_image:
-        try:
-            # Create the directory if it doesn't exist
-            from pathlib import Path
-            UPLOAD_DIR = Path("static/profile_images")
-            UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-            
-            # Save the file
-            file_extension = profile_image.filename.split(".")[-1]
-            new_filename = f"{new_user.id}_{profile_image.filename}"
-            file_path = UPLOAD_DIR / new_filename
-            
-            with open(file_path, "wb") as buffer:
-                contents = await profile_image.read()
-                buffer.write(contents)
-            
-            # Update user with profile image path
-            image_url = f"/static/profile_images/{new_filename}"
-            new_user.profile_image = image_url
-            db.commit()
-            db.refresh(new_user)
-        except Exception as e:
-            # Log error but don't fail the registration
-            print(f"Error saving profile image: {e}")
+    await db.commit()
+    await db.refresh(new_user)
     
     # Also generate and return a token for immediate login
-    access_token = create_database_token(user_id=new_user.id, db=db)
+    access_token = await db.run_sync(lambda session: create_database_token(user_id=new_user.id, db=session))
     
     return new_user
 
@@ -172,10 +181,10 @@ async def update_user(
     full_name: str = Form(None),
     profile_image: UploadFile = File(None),
     current_token: Token = Depends(get_current_token),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     current_user = (
-        db.execute(select(User).where(User.id == current_token.user_id))
+        (await db.execute(select(User).where(User.id == current_token.user_id)))
         .scalars()
         .first()
     )
@@ -185,9 +194,9 @@ async def update_user(
     
     # Check if email is being updated and is already taken by another user
     if email and email != current_user.email:
-        existing_user = db.execute(
+        existing_user = (await db.execute(
             select(User).where(User.email == email, User.id != current_user.id)
-        ).scalars().first()
+        )).scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -197,9 +206,9 @@ async def update_user(
     
     # Check if username is being updated and is already taken by another user
     if username and username != current_user.username:
-        existing_user = db.execute(
+        existing_user = (await db.execute(
             select(User).where(User.username == username, User.id != current_user.id)
-        ).scalars().first()
+        )).scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -213,34 +222,24 @@ async def update_user(
     
     # Update password if provided
     if password:
-        current_user.hashed_password = hash_password(password)
+        current_user.hashed_password = await hash_password_async(password)
     
     # Handle profile image upload
     if profile_image:
         try:
-            # Create the directory if it doesn't exist
-            from pathlib import Path
-            UPLOAD_DIR = Path("static/profile_images")
-            UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-            
-            # Save the file
-            new_filename = f"{current_user.id}_{profile_image.filename}"
-            file_path = UPLOAD_DIR / new_filename
-            
-            with open(file_path, "wb") as buffer:
-                contents = await profile_image.read()
-                buffer.write(contents)
-            
-            # Update user with profile image path
-            image_url = f"/static/profile_images/{new_filename}"
+            image_url, image_variants = await save_profile_image(profile_image, current_user.id)
             current_user.profile_image = image_url
+            current_user.profile_image_variants = image_variants
+        except HTTPException:
+            raise
         except Exception as e:
             # Log error but don't fail the update
-            print(f"Error saving profile image: {e}")
+            logger.exception(f"Error saving profile image: {e}")
     
     # Commit changes
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_cached_user(current_user.id)
     return current_user
 
 
@@ -258,8 +257,10 @@ def delete_user(
     if not current_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    invalidate_cached_user(user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -274,6 +275,7 @@ def refresh_token(
     # Revoke the current token
     current_token.is_revoked = True
     db.commit()
+    invalidate_cached_token(current_token.token)
     
     # Create a new token
     new_token = create_database_token(user_id=current_token.user_id, db=db)
@@ -329,6 +331,7 @@ def confirm_password_reset(token: str = Form(...), new_password: str = Form(...)
     user.reset_token_expires = None
     
     db.commit()
+    invalidate_cached_user(user.id)
     return {"detail": "Password has been reset successfully"}
 
 
@@ -350,6 +353,7 @@ def change_password(
     
     user.hashed_password = hash_password(new_password)
     db.commit()
+    invalidate_cached_user(user.id)
     return {"detail": "Password changed successfully"}
 
 
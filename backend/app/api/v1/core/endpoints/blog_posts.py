@@ -1,32 +1,44 @@
+import hashlib
+import logging
 from typing import List, Optional, Dict, Any
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, func, text
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, load_only
 from datetime import datetime
 
 from app.db_setup import get_db
 from app.api.v1.core.models import BlogPost, User
-from app.api.v1.core.schemas import BlogPostResponse, BlogPostCreate, BlogPostUpdate
+from app.api.v1.core.schemas import BlogPostResponse, BlogPostCreate, BlogPostSummary, BlogPostUpdate
+from app.api.v1.core.pagination import (
+    count_total,
+    fetch_page_with_total,
+    order_by_keys,
+    page_totals,
+    set_next_cursor,
+    set_total_count,
+)
+from app.api.v1.core.services import adjust_blog_category_count, get_blog_category_counts, make_excerpt
+from app.rendering import render_post
+from app.response_cache import CachedRoute, cache_response, etag_matches, response_cache
 from app.security import get_current_active_user, get_admin_user, get_optional_user
 
+logger = logging.getLogger(__name__)
+
 # Update router to use a simpler prefix since the parent router already adds /api/v1
 router = APIRouter(
-    tags=["blog"]
+    tags=["blog"],
+    route_class=CachedRoute,
 )
 
 # Simplified categories endpoint
 @router.get("/categories", response_model=List[Dict[str, Any]])
+@cache_response(ttl=300, tags=["blog_categories"])
 def get_blog_categories(db: Session = Depends(get_db)):
     """Get all blog categories with post counts"""
     try:
-        # Use text() for SQL query to ensure compatibility
-        query = text("""
-            SELECT DISTINCT category_name as name, COUNT(id) as post_count 
-            FROM blog_posts 
-            GROUP BY category_name
-        """)
-        results = db.execute(query).all()
+        # Counts are maintained on every post write, so this is a small indexed read
+        results = get_blog_category_counts(db)
         
         # Process results into the expected format
         categories = [{"id": name, "name": name, "post_count": count} for name, count in results]
@@ -43,7 +55,7 @@ def get_blog_categories(db: Session = Depends(get_db)):
         return categories
     except Exception as e:
         # Log the error but return fallback categories
-        print(f"Error fetching blog categories: {str(e)}")
+        logger.exception(f"Error fetching blog categories: {str(e)}")
         return [
             {"id": "news", "name": "News", "post_count": 0},
             {"id": "research", "name": "Research", "post_count": 0},
@@ -52,72 +64,62 @@ def get_blog_categories(db: Session = Depends(get_db)):
         ]
 
 # Simplified blog posts endpoint with better error handling
-@router.get("/", response_model=List[BlogPostResponse])
+@router.get("/", response_model=List[BlogPostSummary])
 def get_blog_posts(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = Query(0, alias="skip"),
     limit: int = Query(10, alias="limit"),
     category_id: Optional[str] = None,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over skip")
 ):
     """Get all blog posts with optional filtering"""
     try:
-        # Build query with proper joins
-        query = select(BlogPost).join(User, BlogPost.author_id == User.id)
+        # Only the columns the list shows; content stays in the database
+        query = select(BlogPost).options(
+            load_only(
+                BlogPost.title, BlogPost.excerpt, BlogPost.category_name,
+                BlogPost.created_at, BlogPost.updated_at, BlogPost.author_id,
+            ),
+            joinedload(BlogPost.author, innerjoin=True).load_only(User.username, User.full_name),
+        )
         
-        # Apply filtering
+        # Apply filtering; (category_name, created_at, id) is indexed
         if category_id and category_id != 'all':
             query = query.filter(BlogPost.category_name == category_id)
         
-        # Apply sorting
+        # Apply sorting, with id as tie-breaker so keyset pagination is stable
         if sort_by == "title":
             sort_col = BlogPost.title
         elif sort_by == "updated_at":
             sort_col = BlogPost.updated_at
         else:
+            sort_by = "created_at"
             sort_col = BlogPost.created_at
-            
-        if sort_order.lower() == "asc":
-            query = query.order_by(sort_col.asc())
-        else:
-            query = query.order_by(sort_col.desc())
+        descending = sort_order.lower() != "asc"
+        sort_columns = [sort_col, BlogPost.id]
         
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-        
-        # Add eager loading of author
-        query = query.options(joinedload(BlogPost.author))
-        
-        # Execute query
-        posts = db.execute(query).scalars().all()
-        
-        # Transform the result to match expected format
-        result = []
-        for post in posts:
-            post_dict = {
-                "id": post.id,
-                "title": post.title,
-                "content": post.content,
-                "category_name": post.category_name,
-                "created_at": post.created_at,
-                "updated_at": post.updated_at,
-                "author_id": post.author_id,
-                "author": {
-                    "id": post.author_id,
-                    "username": post.author.username,
-                    "full_name": post.author.full_name
-                },
-                "category": {
-                    "id": post.category_name,
-                    "name": post.category_name
-                }
-            }
-            result.append(post_dict)
+        # Apply pagination: keyset for cursor requests and the first page
+        total_key = ("blog_posts", category_id if category_id != 'all' else None)
+        if cursor or skip == 0:
+            sort_key = f"{sort_by}:{'desc' if descending else 'asc'}"
+            posts, next_cursor, total = fetch_page_with_total(
+                db, query, sort_columns, descending, sort_key, total_key, limit=limit, cursor=cursor
+            )
+            set_next_cursor(response, next_cursor)
+        else:
+            total = count_total(db, query, total_key)
+            query = order_by_keys(query, sort_columns, descending).offset(skip).limit(limit)
+            posts = db.execute(query).scalars().all()
+        set_total_count(response, total)
         
-        return result
+        return posts
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error fetching blog posts: {str(e)}")
+        logger.exception(f"Error fetching blog posts: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve blog posts: {str(e)}"
@@ -127,9 +129,11 @@ def get_blog_posts(
 @router.get("/{post_id}", response_model=BlogPostResponse)
 def get_blog_post(
     post_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Get a specific blog post by ID"""
+    """Get a specific blog post by ID, with its pre-rendered HTML"""
     try:
         # Use single query with join to load author data
         query = select(BlogPost).where(BlogPost.id == post_id).options(joinedload(BlogPost.author))
@@ -141,11 +145,24 @@ def get_blog_post(
                 detail=f"Blog post with ID {post_id} not found"
             )
         
+        # Posts written before rendering existed, or by an older renderer, are rendered once here
+        if render_post(post):
+            db.commit()
+        
+        version = f"{post.content_hash}:{post.title}:{post.category_name}:{post.updated_at.isoformat()}"
+        etag = f'"{hashlib.sha256(version.encode()).hexdigest()[:32]}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        
         # Transform to expected format
         result = {
             "id": post.id,
             "title": post.title,
             "content": post.content,
+            "content_html": post.content_html,
+            "excerpt": post.excerpt,
             "category_name": post.category_name,
             "created_at": post.created_at,
             "updated_at": post.updated_at,
@@ -165,7 +182,7 @@ def get_blog_post(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching blog post {post_id}: {str(e)}")
+        logger.exception(f"Error fetching blog post {post_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -191,13 +208,18 @@ def create_blog_post(
     new_post = BlogPost(
         title=blog_post.title,
         content=blog_post.content,
+        excerpt=make_excerpt(blog_post.content),
         category_name=blog_post.category_name,  # Changed from category_id
         author_id=current_user.id
     )
+    render_post(new_post)
     
     db.add(new_post)
+    adjust_blog_category_count(db, new_post.category_name, 1)
     db.commit()
     db.refresh(new_post)
+    response_cache.invalidate("blog_categories")
+    page_totals.invalidate("blog_posts")
     
     return new_post
 
@@ -222,13 +244,22 @@ def update_blog_post(
     # Update fields
     update_data = post_update.dict(exclude_unset=True)
     
+    old_category = post.category_name
     for key, value in update_data.items():
         setattr(post, key, value)
+    if "content" in update_data:
+        post.excerpt = make_excerpt(post.content)
+        render_post(post)
+    if post.category_name != old_category:
+        adjust_blog_category_count(db, old_category, -1)
+        adjust_blog_category_count(db, post.category_name, 1)
     
     post.updated_at = datetime.utcnow()  # Update the timestamp
     
     db.commit()
     db.refresh(post)
+    response_cache.invalidate("blog_categories")
+    page_totals.invalidate("blog_posts")
     
     return post
 
@@ -250,6 +281,9 @@ def delete_blog_post(
         )
     
     db.delete(post)
+    adjust_blog_category_count(db, post.category_name, -1)
     db.commit()
+    response_cache.invalidate("blog_categories")
+    page_totals.invalidate("blog_posts")
     
     return None
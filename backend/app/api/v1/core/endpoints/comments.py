@@ -1,27 +1,75 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 from app.db_setup import get_db
-from app.api.v1.core.models import Comment
-from app.api.v1.core.schemas import CommentCreate, CommentSchema
+from app.api.v1.core.models import Comment, User
+from app.api.v1.core.schemas import CommentCreate, CommentSchema, CommentThread
+from app.api.v1.core.pagination import set_next_cursor
+from app.api.v1.core.services import get_comment_replies, get_comment_threads
+from app.fanout import notification_fanout, notify_new_comment
+from app.security import get_current_active_user
 
 # Fix: Remove duplicate API prefix, it's already added in main.py
 router = APIRouter(tags=["comments"])
 
 @router.post("/", response_model=CommentSchema, status_code=status.HTTP_201_CREATED, operation_id="create_new_comment_v1")
-def create_comment(comment: CommentCreate, db: Session = Depends(get_db)) -> CommentSchema:
-    new_comment = Comment(**comment.model_dump())
+def create_comment(
+    comment: CommentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> CommentSchema:
+    if comment.parent_comment_id:
+        parent_item_id = db.scalar(select(Comment.cultural_item_id).where(Comment.id == comment.parent_comment_id))
+        if parent_item_id != comment.cultural_item_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parent comment not found on this item")
+    new_comment = Comment(**comment.model_dump(), user_id=current_user.id)
     db.add(new_comment)
     db.commit()
     db.refresh(new_comment)
+    # Replies and favoriter notices are written in the background
+    notification_fanout.submit(notify_new_comment, new_comment.id)
     return new_comment
 
 @router.get("/{cultural_item_id}", response_model=list[CommentSchema], operation_id="list_comments_by_cultural_item_v1")
 def get_comments(item_id: UUID, db: Session = Depends(get_db)) -> list[CommentSchema]:
     return db.execute(select(Comment).where(Comment.cultural_item_id == item_id)).scalars().all()
 
+@router.get("/{cultural_item_id}/threads", response_model=list[CommentThread], operation_id="list_comment_threads_by_cultural_item_v1")
+def get_comment_threads_for_item(
+    response: Response,
+    cultural_item_id: UUID,
+    limit: int = Query(20, ge=1, le=100, description="Top-level comments per page"),
+    depth: int = Query(3, ge=0, le=10, description="Levels of replies to include"),
+    replies_limit: int = Query(10, ge=0, le=100, description="Replies included per comment"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    db: Session = Depends(get_db),
+) -> list[CommentThread]:
+    """Top-level comments of an item, oldest first, with nested replies"""
+    threads, next_cursor = get_comment_threads(
+        db, cultural_item_id, limit=limit, depth=depth, replies_limit=replies_limit, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return threads
+
+@router.get("/{comment_id}/replies", response_model=list[CommentThread], operation_id="list_comment_replies_v1")
+def get_replies(
+    response: Response,
+    comment_id: UUID,
+    limit: int = Query(20, ge=1, le=100, description="Replies per page"),
+    depth: int = Query(2, ge=0, le=10, description="Levels of nested replies to include"),
+    replies_limit: int = Query(10, ge=0, le=100, description="Nested replies included per reply"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header or a comment's replies_cursor"),
+    db: Session = Depends(get_db),
+) -> list[CommentThread]:
+    """Direct replies to a comment, oldest first, with their own nested replies"""
+    threads, next_cursor = get_comment_replies(
+        db, comment_id, limit=limit, depth=depth, replies_limit=replies_limit, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return threads
+
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT, operation_id="delete_comment_by_id_v1")
 def delete_comment(comment_id: UUID, db: Session = Depends(get_db)):
     db_comment = db.execute(select(Comment).where(Comment.id == comment_id)).scalars().first()
@@ -1,9 +1,13 @@
+import logging
+from pathlib import Path
 from typing import List, Optional, Literal
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db_setup import get_db
+from app.db_setup import get_async_db, get_db
 from app.api.v1.core.models import CulturalItem as DbCulturalItem, User, Media as DbMedia, Tag as DbTag
 from app.api.v1.core.schemas import (
     CulturalItem,
@@ -13,29 +17,45 @@ from app.api.v1.core.schemas import (
     Tag,
     MediaCreate,
     Media,
+    IngestRequest,
+    IngestJob,
+    DataSourceStats,
+    CulturalItemFacets,
+    FacetCount,
 )
 from app.api.v1.core.services import (
-    get_cultural_items as get_items_service,
-    search_cultural_items,
+    get_random_cultural_items as get_random_items_service,
+    get_cultural_items_page,
+    get_cultural_items_page_async,
     get_all_tags,
-    get_cultural_items_by_tag,
-    get_cultural_items_by_region,
-    get_cultural_items_by_time_period,
-    get_featured_cultural_items,
+    get_tags_page,
+    get_featured_cultural_items_async,
     get_cultural_item,
+    get_cultural_item_detail,
     create_cultural_item,
     create_media,
     update_cultural_item,
-    delete_cultural_item
+    delete_cultural_item,
+    filter_cultural_items_query,
+    get_data_source_statistics,
+    get_cultural_items_by_source,
+    get_cultural_item_facets,
 )
+from app.api.v1.core.pagination import set_next_cursor, set_total_count
+from app.export import FORMATS as EXPORT_FORMATS, export_statement, stream_export
+from app.ingest import ingest_jobs
+from app.response_cache import CachedRoute, cache_response
 from app.security import get_current_active_user, get_admin_user, get_optional_user
-import random
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
 
 # Router with explicit prefix - fix the duplicated prefix
-router = APIRouter(tags=["cultural_items"], prefix="/cultural-items")
+router = APIRouter(tags=["cultural_items"], prefix="/cultural-items", route_class=CachedRoute)
 
 @router.get("/", response_model=List[CulturalItem])
-def get_cultural_items(
+async def get_cultural_items(
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=1000, description="Number of items per page"),
     sort_by: str = Query("created_at", description="Field to sort by"),
@@ -44,97 +64,97 @@ def get_cultural_items(
     time_period: Optional[str] = Query(None, description="Filter by time period"),
     query: Optional[str] = Query(None, description="Search query"),
     with_coordinates: Optional[bool] = Query(None, description="Filter items with coordinates"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over page"),
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[CulturalItem]:
     """Fetch cultural items with filtering, sorting and pagination."""
     try:
-        print(f"Processing request for cultural items: page={page}, limit={limit}")
-        skip = (page - 1) * limit
-        
-        # If search query is provided, use search function
-        if query:
-            items = search_cultural_items(db, query=query, skip=skip, limit=limit)
-        else:
-            items = get_items_service(db, skip=skip, limit=limit)
+        logger.debug(f"Processing request for cultural items: page={page}, limit={limit}")
         
-        print(f"Retrieved {len(items)} items from database")
-        
-        # If no items were found, try with a direct database query as a fallback
-        if not items:
-            print("No items found with service, trying direct query")
-            items = db.query(DbCulturalItem).limit(limit).all()
-            print(f"Direct query returned {len(items)} items")
-        
-        # Apply filters if needed
-        if region:
-            items = [item for item in items if item.region and region.lower() in item.region.lower()]
-        if time_period:
-            items = [item for item in items if item.time_period and time_period.lower() in item.time_period.lower()]
+        # Filters, search and sorting all run in SQL so the page is exact
+        items, next_cursor, total = await get_cultural_items_page_async(
+            db,
+            page=page,
+            limit=limit,
+            cursor=cursor,
+            query=query,
+            region=region,
+            time_period=time_period,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+        set_next_cursor(response, next_cursor)
+        set_total_count(response, total)
         
-        # Sort items
-        reverse = sort_order.lower() == "desc"
-        if sort_by == "title":
-            return sorted(items, key=lambda x: x.title.lower() if x.title else "", reverse=reverse)
-        else:  # default to created_at
-            return sorted(items, key=lambda x: x.created_at, reverse=reverse)
+        logger.debug(f"Retrieved {len(items)} items from database")
+        return items
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in get_cultural_items endpoint: {str(e)}")
+        logger.exception(f"Error in get_cultural_items endpoint: {str(e)}")
         # Return empty list instead of raising exception to prevent API failures
         return []
 
 @router.get("/search", response_model=List[CulturalItem], operation_id="search_cultural_items_v1")
-def search_items(
+async def search_items(
+    response: Response,
     query: str,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(100, ge=1, le=1000, description="Number of items per page (use 1000 for all)"),
     is_featured: Optional[bool] = Query(None, description="Filter by featured items"),
     region: Optional[str] = Query(None, description="Filter by region"),
     time_period: Optional[str] = Query(None, description="Filter by time period"),
-    sort_by: Optional[Literal["title", "created_at"]] = Query("created_at", description="Sort by field"),
+    sort_by: Optional[Literal["relevance", "title", "created_at"]] = Query("relevance", description="Sort by field"),
     sort_order: Optional[Literal["asc", "desc"]] = Query("desc", description="Sort order"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over page"),
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[CulturalItem]:
-    skip = (page - 1) * limit
-    items = search_cultural_items(db, query=query, skip=skip, limit=limit)
-    
-    # Apply filters
-    if is_featured is not None:
-        items = [item for item in items if item.is_featured == is_featured]
-    if region:
-        items = [item for item in items if item.region and region.lower() in item.region.lower()]
-    if time_period:
-        items = [item for item in items if item.time_period and time_period.lower() in item.time_period.lower()]
-    
-    # Apply sorting
-    reverse = sort_order == "desc"
-    if sort_by == "title":
-        return sorted(items, key=lambda x: x.title.lower(), reverse=reverse)
-    else:  # default to created_at
-        return sorted(items, key=lambda x: x.created_at, reverse=reverse)
+    items, next_cursor, total = await get_cultural_items_page_async(
+        db,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        query=query,
+        is_featured=is_featured,
+        region=region,
+        time_period=time_period,
+        sort_by=sort_by,
+        sort_order=sort_order,
+    )
+    set_next_cursor(response, next_cursor)
+    set_total_count(response, total)
+    return items
 
 @router.get("/random", response_model=List[CulturalItem], operation_id="get_random_cultural_items_v1")
 def get_random_cultural_items(
     count: int = Query(5, ge=1, le=20, description="Number of random items to return"),
+    featured: Optional[bool] = Query(None, description="Only draw featured (true) or non-featured (false) items"),
+    region: Optional[str] = Query(None, description="Only draw items from this region"),
     db: Session = Depends(get_db),
 ) -> List[CulturalItem]:
     """
-    Get random cultural items. Useful for homepage showcases or recommendations.
+    Get random cultural items, drawn uniformly from the whole catalog. Useful for homepage showcases or recommendations.
     """
-    all_items = get_items_service(db, skip=0, limit=100)
-    if len(all_items) <= count:
-        return all_items
-    return random.sample(all_items, count)
+    return get_random_items_service(db, count, is_featured=featured, region=region)
 
 @router.get("/tags", response_model=List[Tag], operation_id="list_tags_v1")
+@cache_response(ttl=300, tags=["tags"])
 def read_tags(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over skip"),
     db: Session = Depends(get_db),
 ) -> List[Tag]:
+    if cursor or skip == 0:
+        tags, next_cursor = get_tags_page(db, limit=limit, cursor=cursor)
+        set_next_cursor(response, next_cursor)
+        return tags
     return get_all_tags(db, skip=skip, limit=limit)
 
 @router.get("/tags/{tag_name}", response_model=List[CulturalItem], operation_id="get_cultural_items_by_tag_v1")
 def read_cultural_items_by_tag(
+    response: Response,
     tag_name: str,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(100, ge=1, le=100, description="Number of items per page"),
@@ -143,70 +163,146 @@ def read_cultural_items_by_tag(
     time_period: Optional[str] = Query(None, description="Filter by time period"),
     sort_by: Optional[Literal["title", "created_at"]] = Query("created_at", description="Sort by field"),
     sort_order: Optional[Literal["asc", "desc"]] = Query("desc", description="Sort order"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over page"),
     db: Session = Depends(get_db),
 ) -> List[CulturalItem]:
-    skip = (page - 1) * limit
-    items = get_cultural_items_by_tag(db, tag_name=tag_name, skip=skip, limit=limit)
-    
-    # Apply filters
-    if is_featured is not None:
-        items = [item for item in items if item.is_featured == is_featured]
-    if region:
-        items = [item for item in items if item.region and region.lower() in item.region.lower()]
-    if time_period:
-        items = [item for item in items if item.time_period and time_period.lower() in item.time_period.lower()]
-    
-    # Apply sorting
-    reverse = sort_order == "desc"
-    if sort_by == "title":
-        return sorted(items, key=lambda x: x.title.lower(), reverse=reverse)
-    else:  # default to created_at
-        return sorted(items, key=lambda x: x.created_at, reverse=reverse)
+    items, next_cursor = get_cultural_items_page(
+        db,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        tag_name=tag_name,
+        is_featured=is_featured,
+        region=region,
+        time_period=time_period,
+        sort_by=sort_by,
+        sort_order=sort_order,
+    )
+    set_next_cursor(response, next_cursor)
+    return items
 
 @router.get("/regions/{region}", response_model=List[CulturalItem], operation_id="get_cultural_items_by_region_v1")
 def read_cultural_items_by_region(
+    response: Response,
     region: str,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(100, ge=1, le=100, description="Number of items per page"),
     is_featured: Optional[bool] = Query(None, description="Filter by featured items"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over page"),
     db: Session = Depends(get_db),
 ) -> List[CulturalItem]:
-    skip = (page - 1) * limit
-    items = get_cultural_items_by_region(db, region=region, skip=skip, limit=limit)
-    if is_featured is not None:
-        items = [item for item in items if item.is_featured == is_featured]
-    return sorted(items, key=lambda x: x.created_at, reverse=True)
+    items, next_cursor = get_cultural_items_page(
+        db, page=page, limit=limit, cursor=cursor, region=region, is_featured=is_featured
+    )
+    set_next_cursor(response, next_cursor)
+    return items
 
 @router.get("/time-periods/{time_period}", response_model=List[CulturalItem], operation_id="get_cultural_items_by_time_period_v1")
 def read_cultural_items_by_time_period(
+    response: Response,
     time_period: str,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(100, ge=1, le=100, description="Number of items per page"),
     is_featured: Optional[bool] = Query(None, description="Filter by featured items"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over page"),
     db: Session = Depends(get_db),
 ) -> List[CulturalItem]:
-    skip = (page - 1) * limit
-    items = get_cultural_items_by_time_period(db, time_period=time_period, skip=skip, limit=limit)
-    if is_featured is not None:
-        items = [item for item in items if item.is_featured == is_featured]
-    return sorted(items, key=lambda x: x.created_at, reverse=True)
+    items, next_cursor = get_cultural_items_page(
+        db, page=page, limit=limit, cursor=cursor, time_period=time_period, is_featured=is_featured
+    )
+    set_next_cursor(response, next_cursor)
+    return items
 
 @router.get("/featured", response_model=List[CulturalItem], operation_id="get_featured_cultural_items_v1")
-def read_featured_cultural_items(
-    db: Session = Depends(get_db),
+@cache_response(ttl=300, tags=["cultural_items"])
+async def read_featured_cultural_items(
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[CulturalItem]:
     """
     Get featured cultural items.
     """
-    items = get_featured_cultural_items(db)
+    items = await get_featured_cultural_items_async(db)
+    return items
+
+@router.get("/facets", response_model=CulturalItemFacets, operation_id="get_cultural_item_facets_v1")
+@cache_response(ttl=300, tags=["cultural_items", "tags"])
+def read_cultural_item_facets(
+    query: Optional[str] = Query(None, description="Search query"),
+    region: Optional[str] = Query(None, description="Filter by region"),
+    time_period: Optional[str] = Query(None, description="Filter by time period"),
+    is_featured: Optional[bool] = Query(None, description="Filter by featured items"),
+    tag_name: Optional[str] = Query(None, description="Filter by tag"),
+    source: Optional[str] = Query(None, description="Filter by data source"),
+    limit: int = Query(20, ge=1, le=200, description="Most frequent values returned per facet"),
+    db: Session = Depends(get_db),
+) -> CulturalItemFacets:
+    """
+    Item counts per region, time period, featured flag and tag for the items matching the filters.
+    """
+    facets = get_cultural_item_facets(
+        db, limit=limit, query=query, region=region, time_period=time_period,
+        is_featured=is_featured, tag_name=tag_name, source=source.lower() if source else None,
+    )
+    return CulturalItemFacets(
+        total=facets.pop("total"),
+        **{name: [FacetCount(value=value, count=count) for value, count in values] for name, values in facets.items()},
+    )
+
+@router.get("/sources", response_model=DataSourceStats, operation_id="get_data_source_statistics_v1")
+def read_data_source_statistics(db: Session = Depends(get_db)) -> DataSourceStats:
+    """
+    Number of cultural items per data source (getty, smithsonian, manual, ...).
+    """
+    return get_data_source_statistics(db)
+
+@router.get("/sources/{source}", response_model=List[CulturalItem], operation_id="get_cultural_items_by_source_v1")
+def read_cultural_items_by_source(
+    response: Response,
+    source: str,
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(100, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over page"),
+    db: Session = Depends(get_db),
+) -> List[CulturalItem]:
+    items, next_cursor = get_cultural_items_by_source(db, source, page=page, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
     return items
 
+@router.get("/export", response_class=StreamingResponse, operation_id="export_cultural_items_v1")
+def export_cultural_items(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Output format"),
+    region: Optional[str] = Query(None, description="Filter by region"),
+    time_period: Optional[str] = Query(None, description="Filter by time period"),
+    is_featured: Optional[bool] = Query(None, description="Filter by featured items"),
+    tag_name: Optional[str] = Query(None, description="Filter by tag"),
+    query: Optional[str] = Query(None, description="Search query"),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream the whole (filtered) catalog as NDJSON or CSV, gzipped when the client accepts it.
+    """
+    statement = filter_cultural_items_query(
+        query, region, time_period, is_featured, tag_name, statement=export_statement()
+    ).order_by(DbCulturalItem.created_at, DbCulturalItem.id)
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {
+        "Content-Disposition": f'attachment; filename="cultural-items.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_export(db, statement, format, compress), media_type=EXPORT_FORMATS[format], headers=headers
+    )
+
 @router.get("/{cultural_item_id}", response_model=CulturalItemDetail, operation_id="get_cultural_item_detail_v1")
+@cache_response(ttl=300, tags=["cultural_items"])
 def read_cultural_item(
     cultural_item_id: UUID,
     db: Session = Depends(get_db),
 ) -> CulturalItemDetail:
-    db_item = get_cultural_item(db, cultural_item_id=cultural_item_id)
+    db_item = get_cultural_item_detail(db, cultural_item_id=cultural_item_id)
     if not db_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
@@ -235,6 +331,32 @@ def create_new_media(
     # Create media using the appropriate model structure
     return create_media(db=db, media=media)
 
+@router.post("/ingest", response_model=IngestJob, status_code=status.HTTP_202_ACCEPTED, operation_id="ingest_cultural_items_v1")
+def start_ingest(
+    request: IngestRequest,
+    current_user: User = Depends(get_admin_user),
+) -> IngestJob:
+    """Bulk-load an NDJSON or CSV dump from INGEST_DIR in the background; poll the returned job for progress"""
+    ingest_dir = Path(settings.INGEST_DIR).resolve()
+    path = (ingest_dir / request.path).resolve()
+    if not path.is_relative_to(ingest_dir):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Path must be inside the ingest directory")
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"File {request.path} not found")
+    report = ingest_jobs.submit(path, fmt=request.format, resume=request.resume, source=request.source)
+    logger.info(f"Ingest of {path} queued by {current_user.username}", extra={"ingest_id": report.id})
+    return IngestJob(**report.as_dict())
+
+@router.get("/ingest/{job_id}", response_model=IngestJob, operation_id="get_ingest_job_v1")
+def read_ingest_job(
+    job_id: str,
+    current_user: User = Depends(get_admin_user),
+) -> IngestJob:
+    report = ingest_jobs.get(job_id)
+    if not report:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingest job not found")
+    return IngestJob(**report.as_dict())
+
 @router.put("/{cultural_item_id}", response_model=CulturalItem, operation_id="update_existing_cultural_item_v1")
 def update_item(
     cultural_item_id: UUID,
@@ -1,21 +1,24 @@
+import logging
 from typing import List, Optional, Any, Dict
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from datetime import datetime
 
-from app.db_setup import get_db
+from app.db_setup import get_async_db, get_db
 from app.api.v1.core.models import Event
 from app.api.v1.core.services import (
-    get_all_events,
     get_event,
-    get_upcoming_events, 
-    get_past_events
+    get_events_page_async,
 )
+from app.response_cache import CachedRoute, cache_response
 from app.security import get_current_active_user, get_admin_user, get_optional_user
 
-router = APIRouter(tags=["events"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["events"], route_class=CachedRoute)
 
 # Define Pydantic models for API responses
 class EventResponse(BaseModel):
@@ -37,47 +40,42 @@ class EventListResponse(BaseModel):
     total: int
     page: int
     limit: int
+    next_cursor: Optional[str] = None
 
 @router.get("/", response_model=EventListResponse, operation_id="list_events_v1")
-def read_events(
+# Short TTL: upcoming/past move with the clock, and events are written
+# outside the API, so the TTL bounds staleness. Event writes added to the
+# API must call response_cache.invalidate("events")
+@cache_response(ttl=60, tags=["events"])
+async def read_events(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(100, ge=1, le=100, description="Number of items per page"),
     filter_type: Optional[str] = Query(None, description="Filter by event type (upcoming, past, all)"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from a previous next_cursor; takes precedence over page"),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Get all events with optional filtering
     """
-    skip = (page - 1) * limit
-    
     try:
-        if filter_type == "upcoming":
-            events = get_upcoming_events(db, skip=skip, limit=limit)
-        elif filter_type == "past":
-            events = get_past_events(db, skip=skip, limit=limit)
-        else:
-            events = get_all_events(db, skip=skip, limit=limit)
-            
-        # Count total events (approximate for pagination)
-        # In a real-world scenario, we would use a COUNT query
-        total_events = len(events) if len(events) < limit else limit * 2
+        events, next_cursor, total = await get_events_page_async(db, filter_type=filter_type, page=page, limit=limit, cursor=cursor)
         
         return {
             "items": events,
-            "total": total_events,
+            "total": total.value,
             "page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        # Log the error
-        print(f"Error fetching events: {str(e)}")
-        # Return empty result instead of failing
-        return {
-            "items": [],
-            "total": 0,
-            "page": page,
-            "limit": limit
-        }
+        # An error response is not cached, unlike an empty page would be
+        logger.exception(f"Error fetching events: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve events: {str(e)}"
+        )
 
 @router.get("/{event_id}", response_model=EventResponse, operation_id="get_event_detail_v1")
 def read_event(
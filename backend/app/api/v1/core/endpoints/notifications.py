@@ -1,28 +1,43 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy import select, update
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db_setup import get_db
+from app.db_setup import get_async_db, get_db
 from app.api.v1.core.models import Notification, User
 from app.api.v1.core.schemas import NotificationResponse, NotificationUpdate
+from app.api.v1.core.pagination import (
+    count_total_async,
+    fetch_page_with_total_async,
+    set_next_cursor,
+    set_total_count,
+)
+from app.api.v1.core.services import (
+    delete_notification as delete_notification_service,
+    get_unread_count_async,
+    mark_all_notifications_read,
+    set_notification_read,
+)
 from app.security import get_current_active_user
 
 # Use the prefix parameter when defining the router
 router = APIRouter(
-    prefix="/api/v1/notifications", 
+    prefix="/notifications", 
     tags=["notifications"]
 )
 
 # Update the path to be relative to the prefix
 @router.get("", response_model=List[NotificationResponse])
-def get_notifications(
-    db: Session = Depends(get_db),
+async def get_notifications(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
     unread_only: bool = False,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over skip"),
 ) -> List[NotificationResponse]:
     """Get notifications for the current user"""
     query = select(Notification).where(Notification.user_id == current_user.id)
@@ -30,32 +45,44 @@ def get_notifications(
     if unread_only:
         query = query.where(Notification.is_read == False)
     
-    query = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit)
+    # Keyset pagination for cursor requests and the first page
+    total_key = ("notifications", current_user.id, unread_only)
+    if cursor or skip == 0:
+        notifications, next_cursor, total = await fetch_page_with_total_async(
+            db, query, [Notification.created_at, Notification.id], True, "created_at:desc", total_key,
+            limit=limit, cursor=cursor,
+        )
+        set_next_cursor(response, next_cursor)
+        set_total_count(response, total)
+        return notifications
+    
+    set_total_count(response, await count_total_async(db, query, total_key))
+    query = query.order_by(Notification.created_at.desc(), Notification.id.desc()).offset(skip).limit(limit)
     
-    notifications = db.execute(query).scalars().all()
+    notifications = (await db.execute(query)).scalars().all()
     return notifications
 
 # Update the path to be relative to the prefix
 @router.get("/unread-count", response_model=dict)
-def get_unread_count(
-    db: Session = Depends(get_db),
+async def get_unread_count(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ) -> dict:
     """Get count of unread notifications for the current user."""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
-    return {"unread_count": count}
+    return {"unread_count": await get_unread_count_async(db, current_user.id)}
 
-@router.put("/{notification_id}", response_model=NotificationResponse)
-def update_notification(
-    notification_id: UUID,
-    notification_update: NotificationUpdate,
+# Declared before PUT /{notification_id}, which would otherwise match
+# "mark-all-read" and reject it as an invalid UUID
+@router.put("/mark-all-read", response_model=dict)
+def mark_all_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> NotificationResponse:
-    """Mark a notification as read/unread"""
+) -> dict:
+    """Mark all notifications as read for the current user"""
+    count = mark_all_notifications_read(db, current_user.id)
+    return {"message": "All notifications marked as read", "count": count}
+
+def _get_own_notification(db: Session, notification_id: UUID, current_user: User) -> Notification:
     notification = db.execute(
         select(Notification).where(
             Notification.id == notification_id,
@@ -68,32 +95,18 @@ def update_notification(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Notification with ID {notification_id} not found"
         )
-    
-    # Update the notification
-    notification.is_read = notification_update.is_read
-    db.commit()
-    db.refresh(notification)
-    
     return notification
 
-@router.put("/mark-all-read", response_model=dict)
-def mark_all_read(
+@router.put("/{notification_id}", response_model=NotificationResponse)
+def update_notification(
+    notification_id: UUID,
+    notification_update: NotificationUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> dict:
-    """Mark all notifications as read for the current user"""
-    result = db.execute(
-        update(Notification)
-        .where(
-            Notification.user_id == current_user.id,
-            Notification.is_read == False
-        )
-        .values(is_read=True)
-    )
-    
-    db.commit()
-    
-    return {"message": "All notifications marked as read", "count": result.rowcount}
+) -> NotificationResponse:
+    """Mark a notification as read/unread"""
+    notification = _get_own_notification(db, notification_id, current_user)
+    return set_notification_read(db, notification, notification_update.is_read)
 
 @router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_notification(
@@ -102,20 +115,7 @@ def delete_notification(
     current_user: User = Depends(get_current_active_user),
 ) -> Response:
     """Delete a notification"""
-    notification = db.execute(
-        select(Notification).where(
-            Notification.id == notification_id,
-            Notification.user_id == current_user.id
-        )
-    ).scalars().first()
-    
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Notification with ID {notification_id} not found"
-        )
-    
-    db.delete(notification)
-    db.commit()
+    notification = _get_own_notification(db, notification_id, current_user)
+    delete_notification_service(db, notification)
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
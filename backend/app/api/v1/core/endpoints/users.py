@@ -2,22 +2,16 @@ from typing import Annotated, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db_setup import get_db
+from app.db_setup import get_async_db, get_db
 from app.api.v1.core.models import User
 from app.api.v1.core.schemas import UserUpdate, UserOutSchema
-from app.security import get_current_active_user
-import shutil
-import os
-from pathlib import Path
+from app.security import get_current_active_user, invalidate_cached_user
+from app.uploads import save_profile_image
 
 router = APIRouter(tags=["users"], prefix="/users")
 
-# Define where profile images will be stored
-UPLOAD_DIR = Path("static/profile_images")
-# Ensure the directory exists
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 @router.get("/{user_id}", response_model=UserOutSchema)
 def get_user(
     user_id: UUID, db: Session = Depends(get_db)
@@ -60,18 +54,19 @@ def update_user(
         setattr(db_user, key, value)
     db.commit()
     db.refresh(db_user)
+    invalidate_cached_user(db_user.id)
     return db_user
 
 @router.post("/{user_id}/profile-image", response_model=UserOutSchema)
 async def upload_profile_image(
     user_id: UUID,
     profile_image: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Upload a profile image for the user"""
     # Check if the user exists
-    db_user = db.execute(select(User).where(User.id == user_id)).scalars().first()
+    db_user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -83,27 +78,12 @@ async def upload_profile_image(
             detail="Not authorized to update this user's profile"
         )
     
-    # Validate file type (only allow images)
-    allowed_types = ["image/jpeg", "image/png", "image/gif"]
-    if profile_image.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only image files (JPEG, PNG, GIF) are allowed"
-        )
-    
-    # Generate a unique filename
-    file_extension = profile_image.filename.split(".")[-1]
-    new_filename = f"{user_id}_{profile_image.filename}"
-    file_path = UPLOAD_DIR / new_filename
-    
-    # Save the file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(profile_image.file, buffer)
-    
-    # Update the user's profile image URL
-    image_url = f"/static/profile_images/{new_filename}"
+    # Stream, validate and resize the upload
+    image_url, image_variants = await save_profile_image(profile_image, user_id)
     db_user.profile_image = image_url
-    db.commit()
-    db.refresh(db_user)
+    db_user.profile_image_variants = image_variants
+    await db.commit()
+    await db.refresh(db_user)
+    invalidate_cached_user(db_user.id)
     
     return db_user
@@ -0,0 +1,315 @@
+"""Database schema upgrades.
+
+Cheap upgrades (new nullable columns, guarded metadata changes) are applied
+by init_db at startup, and a failing one stops the app. Anything that
+rewrites or backfills a table or builds an index on an existing table is a
+one-off migration instead, run explicitly from the backend directory after
+deploying:
+
+    python -m app.api.v1.core.migrations
+
+Indexes are built CONCURRENTLY, so reads and writes continue meanwhile.
+Startup only logs which migrations are still pending.
+"""
+import argparse
+import logging
+import re
+from typing import Callable, List, Set
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, Index
+
+from app.api.v1.core.models import Base, CULTURAL_ITEM_SEARCH_VECTOR, SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+COMMAND = "python -m app.api.v1.core.migrations"
+
+# Startup upgrades give up instead of queueing behind long transactions
+# (and blocking every query queued behind them)
+STARTUP_LOCK_TIMEOUT = "5s"
+
+
+class SchemaUpgradeError(RuntimeError):
+    """A startup schema upgrade failed"""
+
+
+# create_all() only creates missing tables, so columns added to existing
+# tables are upgraded here. Every statement must be safe to run repeatedly
+# and must not rewrite or scan a table.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE schema_migrations ADD COLUMN IF NOT EXISTS checkpoint VARCHAR(255)",
+    "ALTER TABLE schema_migrations ALTER COLUMN applied_at DROP NOT NULL",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_image_variants JSONB",
+    # A constant default does not rewrite the table; existing rows are
+    # classified by backfill_item_sources
+    "ALTER TABLE cultural_items ADD COLUMN IF NOT EXISTS source VARCHAR(50) NOT NULL DEFAULT 'manual'",
+    "ALTER TABLE cultural_items ADD COLUMN IF NOT EXISTS external_id VARCHAR(255)",
+    # Notifications outlive the item or comment they point at. The old
+    # constraints already held for every row, so the new ones skip the scan
+    # here and are validated by validate_notification_foreign_keys
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = 'notifications'::regclass AND confdeltype <> 'n'
+              AND conname IN ('notifications_cultural_item_id_fkey', 'notifications_comment_id_fkey')
+        ) THEN
+            ALTER TABLE notifications
+                DROP CONSTRAINT IF EXISTS notifications_cultural_item_id_fkey,
+                DROP CONSTRAINT IF EXISTS notifications_comment_id_fkey,
+                ADD CONSTRAINT notifications_cultural_item_id_fkey FOREIGN KEY (cultural_item_id)
+                    REFERENCES cultural_items (id) ON DELETE SET NULL NOT VALID,
+                ADD CONSTRAINT notifications_comment_id_fkey FOREIGN KEY (comment_id)
+                    REFERENCES comments (id) ON DELETE SET NULL NOT VALID;
+        END IF;
+    END $$
+    """,
+    # Existing posts are rendered on first view or by python -m app.rendering
+    "ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_html TEXT",
+    "ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    # Existing posts get theirs from backfill_blog_excerpts
+    "ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS excerpt TEXT",
+]
+
+
+def create_index_concurrently(engine: Engine, name: str, ddl: str) -> bool:
+    """Build an index without blocking writes; returns whether it had to be built.
+
+    An interrupted concurrent build leaves an invalid index behind, which
+    IF NOT EXISTS would skip, so that is dropped and built again.
+    """
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        valid = conn.execute(
+            text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"),
+            {"name": name},
+        ).scalar()
+        if valid:
+            return False
+        if valid is False:
+            logger.warning(f"Dropping invalid index {name} left by an interrupted build", extra={"index": name})
+            conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        logger.info(f"Building index {name}", extra={"index": name})
+        conn.exec_driver_sql(ddl)
+    return True
+
+
+def _model_index_ddl(index: Index, engine: Engine) -> str:
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect)).strip()
+    return re.sub(r"^CREATE (UNIQUE )?INDEX", r"CREATE \1INDEX CONCURRENTLY", ddl)
+
+
+def missing_model_indexes(engine: Engine) -> List[Index]:
+    """Indexes declared on models that are missing or invalid in the database"""
+    with engine.connect() as conn:
+        valid = set(conn.execute(text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indisvalid"
+        )).scalars())
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes if index.name not in valid]
+
+
+def create_model_indexes(engine: Engine) -> int:
+    """Build the model indexes that tables created before them lack; returns how many were built"""
+    return sum(
+        create_index_concurrently(engine, index.name, _model_index_ddl(index, engine))
+        for index in missing_model_indexes(engine)
+    )
+
+
+def add_search_vector(engine: Engine) -> None:
+    # A stored generated column rewrites the table under an exclusive lock;
+    # tables created by create_all() already have it
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            ALTER TABLE cultural_items
+            ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS ({CULTURAL_ITEM_SEARCH_VECTOR}) STORED
+        """))
+
+
+def create_trigram_indexes(engine: Engine) -> None:
+    # Trigram indexes serve the substring (ILIKE '%...%') region and time period filters
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for column in ("region", "time_period"):
+        name = f"ix_cultural_items_{column}_trgm"
+        create_index_concurrently(
+            engine, name, f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON cultural_items USING gin ({column} gin_trgm_ops)"
+        )
+
+
+# Items per transaction of a batched backfill
+BACKFILL_BATCH_SIZE = 5000
+
+# Provenance used to be guessed from image URLs on every query. One batch of
+# the classification of existing rows, in id order after :after; returns the
+# last id of the batch and its size
+BACKFILL_ITEM_SOURCES_SQL = """
+    WITH batch AS (
+        SELECT id FROM cultural_items
+        WHERE id > CAST(:after AS uuid)
+        ORDER BY id
+        LIMIT :batch_size
+    ),
+    updated AS (
+        UPDATE cultural_items SET source = CASE
+            WHEN image_url LIKE '%getty.edu%' THEN 'getty'
+            ELSE 'smithsonian'
+        END
+        FROM batch
+        WHERE cultural_items.id = batch.id
+          AND cultural_items.source = 'manual'
+          AND (image_url LIKE '%getty.edu%' OR image_url LIKE '%.si.edu/%')
+    )
+    SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1), (SELECT count(*) FROM batch)
+"""
+
+
+def _save_checkpoint(conn, name: str, checkpoint: str) -> None:
+    upsert = pg_insert(SchemaMigration).values(name=name, checkpoint=checkpoint)
+    conn.execute(upsert.on_conflict_do_update(index_elements=[SchemaMigration.name], set_={"checkpoint": checkpoint}))
+
+
+def backfill_item_sources(engine: Engine) -> None:
+    # Batches commit with their checkpoint, so an interrupted run resumes
+    # after the last committed batch instead of starting over
+    name = "backfill_item_sources"
+    with engine.connect() as conn:
+        after = conn.execute(select(SchemaMigration.checkpoint).where(SchemaMigration.name == name)).scalar()
+    after = after or "00000000-0000-0000-0000-000000000000"
+    done = 0
+    while True:
+        with engine.begin() as conn:
+            last_id, count = conn.execute(
+                text(BACKFILL_ITEM_SOURCES_SQL), {"after": after, "batch_size": BACKFILL_BATCH_SIZE}
+            ).one()
+            if last_id is not None:
+                after = str(last_id)
+                _save_checkpoint(conn, name, after)
+        done += count
+        if count < BACKFILL_BATCH_SIZE:
+            break
+        logger.info(f"Classified sources of {done} items so far", extra={"migration": name, "items": done})
+
+    from sqlalchemy.orm import Session
+    from app.api.v1.core.services import reconcile_source_counts
+
+    with Session(engine) as db:
+        reconcile_source_counts(db)
+
+
+def backfill_blog_excerpts(engine: Engine) -> None:
+    # Resumes by itself: every batch takes the next posts still without one
+    from sqlalchemy.orm import Session, load_only
+    from app.api.v1.core.models import BlogPost
+    from app.api.v1.core.services import make_excerpt
+
+    with Session(engine) as db:
+        while True:
+            posts = db.execute(
+                select(BlogPost)
+                .options(load_only(BlogPost.content, BlogPost.excerpt))
+                .where(BlogPost.excerpt.is_(None))
+                .order_by(BlogPost.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).scalars().all()
+            for post in posts:
+                post.excerpt = make_excerpt(post.content)
+            db.commit()
+            if len(posts) < BACKFILL_BATCH_SIZE:
+                return
+
+
+def validate_notification_foreign_keys(engine: Engine) -> None:
+    # Scans notifications without blocking reads or writes
+    with engine.begin() as conn:
+        for name in ("notifications_cultural_item_id_fkey", "notifications_comment_id_fkey"):
+            conn.execute(text(f"ALTER TABLE notifications VALIDATE CONSTRAINT {name}"))
+
+
+# One-off migrations in the order they run; each is recorded in
+# schema_migrations once it has succeeded and must be safe to re-run
+# after a failure
+MIGRATIONS: List[Callable[[Engine], None]] = [
+    add_search_vector,
+    create_trigram_indexes,
+    validate_notification_foreign_keys,
+    backfill_item_sources,
+    backfill_blog_excerpts,
+]
+
+
+def applied_migrations(engine: Engine) -> Set[str]:
+    with engine.connect() as conn:
+        return set(conn.execute(select(SchemaMigration.name).where(SchemaMigration.applied_at.isnot(None))).scalars())
+
+
+def pending_migrations(engine: Engine) -> List[str]:
+    """Names of the one-off migrations and model indexes still to be applied"""
+    applied = applied_migrations(engine)
+    pending = [migration.__name__ for migration in MIGRATIONS if migration.__name__ not in applied]
+    return pending + [f"index {index.name}" for index in missing_model_indexes(engine)]
+
+
+def run_migrations(engine: Engine) -> None:
+    """Apply the pending one-off migrations in order, then build missing model indexes.
+
+    Stops at the first failure; running it again continues from there.
+    """
+    applied = applied_migrations(engine)
+    for migration in MIGRATIONS:
+        name = migration.__name__
+        if name in applied:
+            continue
+        logger.info(f"Running migration {name}", extra={"migration": name})
+        migration(engine)
+        with engine.begin() as conn:
+            upsert = pg_insert(SchemaMigration).values(name=name, applied_at=func.now())
+            conn.execute(upsert.on_conflict_do_update(
+                index_elements=[SchemaMigration.name], set_={"applied_at": func.now(), "checkpoint": None}
+            ))
+    built = create_model_indexes(engine)
+    logger.info(f"Schema migrations complete, {built} indexes built", extra={"indexes_built": built})
+
+
+def apply_schema_upgrades(engine: Engine) -> None:
+    """Apply the startup upgrades and warn about one-off migrations still to be run"""
+    for statement in SCHEMA_UPGRADES:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"SET LOCAL lock_timeout = '{STARTUP_LOCK_TIMEOUT}'"))
+                conn.execute(text(statement))
+        except Exception as e:
+            raise SchemaUpgradeError(f"Schema upgrade failed: {str(e)}") from e
+
+    pending = pending_migrations(engine)
+    if pending:
+        logger.warning(
+            f"{len(pending)} schema migrations pending, run {COMMAND}: {', '.join(pending)}",
+            extra={"pending_migrations": pending},
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only list pending migrations; exit status 1 if there are any")
+    args = parser.parse_args()
+
+    from app.db_setup import engine, init_db
+    from app.logging_config import configure_logging
+
+    configure_logging()
+    init_db()
+    if args.check:
+        pending = pending_migrations(engine)
+        print("\n".join(pending) or "No pending migrations")
+        raise SystemExit(1 if pending else 0)
+    run_migrations(engine)
+
+
+if __name__ == "__main__":
+    main()
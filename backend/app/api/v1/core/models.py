@@ -2,8 +2,8 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 from enum import Enum
-from sqlalchemy import Table, Column, ForeignKey, func, String, Text, Boolean, DateTime, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Table, Column, ForeignKey, func, String, Text, Boolean, DateTime, UniqueConstraint, Computed, Index, false
+from sqlalchemy.dialects.postgresql import JSONB, UUID, TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 class Base(DeclarativeBase):
@@ -15,7 +15,9 @@ cultural_item_tag = Table(
     'cultural_item_tag',
     Base.metadata,
     Column('cultural_item_id', UUID(as_uuid=True), ForeignKey('cultural_items.id')),
-    Column('tag_id', UUID(as_uuid=True), ForeignKey('tags.id'))
+    Column('tag_id', UUID(as_uuid=True), ForeignKey('tags.id')),
+    Index('ix_cultural_item_tag_tag_item', 'tag_id', 'cultural_item_id'),
+    Index('ix_cultural_item_tag_item', 'cultural_item_id'),
 )
 
 # Association table for events and cultural items
@@ -26,8 +28,29 @@ event_cultural_item = Table(
     Column('cultural_item_id', UUID(as_uuid=True), ForeignKey('cultural_items.id'))
 )
 
+# Weighted full-text document for cultural items: title ranks highest, then
+# region/time period, description and historical significance.
+CULTURAL_ITEM_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(region, '') || ' ' || coalesce(time_period, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(historical_significance, '')), 'D')"
+)
+
+# Source of items created through the API rather than loaded from a collection
+MANUAL_SOURCE = "manual"
+
 class CulturalItem(Base):
     __tablename__ = "cultural_items"
+    __table_args__ = (
+        Index("ix_cultural_items_search_vector", "search_vector", postgresql_using="gin"),
+        # List sorting/filtering; id is the tie-breaker of every sort
+        Index("ix_cultural_items_created_at_id", "created_at", "id"),
+        Index("ix_cultural_items_featured_created_at_id", "is_featured", "created_at", "id"),
+        Index("ix_cultural_items_source_created_at_id", "source", "created_at", "id"),
+        # Re-ingesting a dump skips records whose source id is already loaded
+        Index("ux_cultural_items_source_external_id", "source", "external_id", unique=True),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -49,10 +72,19 @@ class CulturalItem(Base):
     # View tracking
     view_count: Mapped[int] = mapped_column(default=0)
     
+    # Provenance: the collection an item was loaded from and its id there
+    source: Mapped[str] = mapped_column(String(50), nullable=False, default=MANUAL_SOURCE, server_default=MANUAL_SOURCE)
+    external_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    
     # Metadata
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Full-text search document, kept up to date by the database on insert/update
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR, Computed(CULTURAL_ITEM_SEARCH_VECTOR, persisted=True), nullable=True, deferred=True
+    )
+    
     # Relationships
     tags: Mapped[List["Tag"]] = relationship(secondary=cultural_item_tag, back_populates="cultural_items")
     media: Mapped[List["Media"]] = relationship(back_populates="cultural_item")
@@ -61,6 +93,10 @@ class CulturalItem(Base):
     favorites: Mapped[List["UserFavorite"]] = relationship(back_populates="cultural_item")
 
 
+# Case-insensitive title sort
+Index("ix_cultural_items_title_lower_id", func.lower(CulturalItem.title), CulturalItem.id)
+
+
 class Tag(Base):
     __tablename__ = "tags"
     
@@ -103,9 +139,10 @@ class User(Base):
     # Profile fields
     bio: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     profile_image: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # Added profile image field
+    profile_image_variants: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)  # {size: {"webp": url, "jpeg": url}}
     
     # Relationships
-    tokens: Mapped[List["Token"]] = relationship()
+    tokens: Mapped[List["Token"]] = relationship(back_populates="user")
     favorites: Mapped[List["UserFavorite"]] = relationship(back_populates="user")
     notifications: Mapped[List["Notification"]] = relationship(back_populates="user")
 
@@ -119,10 +156,18 @@ class Token(Base):
     expires_at: Mapped[datetime] = mapped_column(DateTime)
     is_revoked: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    
+    # Relationships
+    user: Mapped["User"] = relationship(back_populates="tokens")
 
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Threaded listing: an item's top-level comments, then each comment's replies, oldest first
+        Index("ix_comments_item_parent_created_at_id", "cultural_item_id", "parent_comment_id", "created_at", "id"),
+        Index("ix_comments_parent_created_at_id", "parent_comment_id", "created_at", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     text: Mapped[str] = mapped_column(Text, nullable=False)
@@ -139,10 +184,19 @@ class Comment(Base):
 
 class BlogPost(Base):
     __tablename__ = "blog_posts"
+    __table_args__ = (
+        Index("ix_blog_posts_created_at_id", "created_at", "id"),
+        Index("ix_blog_posts_category_created_at_id", "category_name", "created_at", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Plain-text start of the content for lists, computed on write
+    excerpt: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Content rendered to HTML by app.rendering and the hash it was rendered from
+    content_html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     category_name: Mapped[str] = mapped_column(String(100), nullable=False)
     author_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -178,6 +232,9 @@ class Contribution(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_start_date_id", "start_date", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -209,11 +266,16 @@ class UserFavorite(Base):
     # Unique constraint to prevent duplicates
     __table_args__ = (
         UniqueConstraint('user_id', 'cultural_item_id', name='unique_user_favorite'),
+        # Favoriters of an item in user order, for notification fan-out
+        Index("ix_user_favorites_item_user", "cultural_item_id", "user_id"),
     )
 
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
@@ -222,11 +284,63 @@ class Notification(Base):
     is_read: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
-    # Optional references to related content
-    cultural_item_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey('cultural_items.id'), nullable=True)
-    comment_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey('comments.id'), nullable=True)
+    # Optional references to related content; deleting it keeps the notification
+    cultural_item_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey('cultural_items.id', ondelete="SET NULL"), nullable=True)
+    comment_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey('comments.id', ondelete="SET NULL"), nullable=True)
     
     # Relationships
     user: Mapped["User"] = relationship(back_populates="notifications")
     cultural_item: Mapped[Optional["CulturalItem"]] = relationship("CulturalItem")
-    comment: Mapped[Optional["Comment"]] = relationship("Comment")
\ No newline at end of file
+    comment: Mapped[Optional["Comment"]] = relationship("Comment")
+
+
+# Unread notifications only: serves unread_only lists and counter reconciliation
+Index(
+    "ix_notifications_user_unread",
+    Notification.user_id, Notification.created_at, Notification.id,
+    postgresql_where=Notification.is_read == false(),
+)
+
+# Let deleting an item or comment find the notifications that reference it
+Index("ix_notifications_cultural_item_id", Notification.cultural_item_id, postgresql_where=Notification.cultural_item_id.isnot(None))
+Index("ix_notifications_comment_id", Notification.comment_id, postgresql_where=Notification.comment_id.isnot(None))
+
+
+# Unread notification count per user, kept in step with notifications by the
+# notification services and repaired by reconcile_unread_counts
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id', ondelete="CASCADE"), primary_key=True)
+    unread_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Number of cultural items per source, kept in step by the item services and
+# app.ingest and repaired by reconcile_source_counts
+class SourceItemCount(Base):
+    __tablename__ = "source_item_counts"
+
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    item_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Number of blog posts per category name, kept in step by the blog endpoints
+# and repaired by reconcile_blog_category_counts
+class BlogCategoryCount(Base):
+    __tablename__ = "blog_category_counts"
+
+    category_name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    post_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# One-off migrations run by app.api.v1.core.migrations: applied_at is set
+# once one has completed, checkpoint holds the progress of a batched one
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    applied_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    checkpoint: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
@@ -0,0 +1,368 @@
+import base64
+import binascii
+import json
+import threading
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.caching import LRUCache
+from app.settings import settings
+
+# List endpoints that return a bare JSON array expose the cursor for the next
+# page through this header; envelope responses carry it as `next_cursor`.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Likewise for the total number of matching rows, flagged when it is a
+# planner estimate rather than an exact count
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _decode_value(value: Any, column) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        # Untyped SQL expressions (e.g. lower(title)) round-trip as plain JSON values
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_key: str, values: Sequence[Any]) -> str:
+    """Encode the sort values of the last row of a page into an opaque cursor"""
+    payload = json.dumps({"k": sort_key, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, sort_key: str, columns: Sequence) -> List[Any]:
+    """Decode a cursor produced by encode_cursor for the same sort key"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["k"] != sort_key or len(payload["v"]) != len(columns):
+            raise ValueError("cursor does not match the requested sort order")
+        return [_decode_value(value, column) for value, column in zip(payload["v"], columns)]
+    except (ValueError, KeyError, TypeError, binascii.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {str(e)}",
+        )
+
+
+def order_by_keys(statement: Select, sort_columns: Sequence, descending: bool) -> Select:
+    """Order a statement by the sort columns, all in the same direction"""
+    return statement.order_by(*[column.desc() if descending else column.asc() for column in sort_columns])
+
+
+def apply_cursor(
+    statement: Select,
+    sort_columns: Sequence,
+    descending: bool,
+    sort_key: str,
+    cursor: Optional[str],
+    limit: int,
+) -> Select:
+    """Turn an ordered statement into a keyset page query.
+
+    The statement must already be ordered by `sort_columns` in the given
+    direction. The sort values are added as extra result columns so the next
+    cursor can be built, and one row more than the page is fetched to know
+    whether there is a next page.
+    """
+    statement = statement.add_columns(*[column.label(f"cursor_{i}") for i, column in enumerate(sort_columns)])
+    if cursor:
+        values = decode_cursor(cursor, sort_key, sort_columns)
+        if descending:
+            statement = statement.where(tuple_(*sort_columns) < tuple_(*values))
+        else:
+            statement = statement.where(tuple_(*sort_columns) > tuple_(*values))
+    return statement.limit(limit + 1)
+
+
+def split_page(rows: Sequence, limit: int, sort_key: str, skip_columns: int = 1) -> Tuple[List[Any], Optional[str]]:
+    """Split rows fetched with apply_cursor into the page entities and the next cursor.
+
+    The cursor values follow the first `skip_columns` columns of each row.
+    """
+    page = rows[:limit]
+    items = [row[0] for row in page]
+    next_cursor = None
+    if len(rows) > limit and page:
+        next_cursor = encode_cursor(sort_key, list(page[-1][skip_columns:]))
+    return items, next_cursor
+
+
+def fetch_page(
+    db: Session,
+    statement: Select,
+    sort_columns: Sequence,
+    descending: bool,
+    sort_key: str,
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page of an unordered statement, returning (items, next_cursor).
+
+    Cursor requests and the first page run as keyset range scans and return
+    the cursor of the following page. Later pages requested by number keep
+    using OFFSET for compatibility and return no cursor.
+    """
+    statement = order_by_keys(statement, sort_columns, descending)
+    if cursor or page <= 1:
+        rows = db.execute(apply_cursor(statement, sort_columns, descending, sort_key, cursor, limit)).all()
+        return split_page(rows, limit, sort_key)
+    items = db.execute(statement.offset((page - 1) * limit).limit(limit)).scalars().all()
+    return items, None
+
+
+async def fetch_page_async(
+    db: AsyncSession,
+    statement: Select,
+    sort_columns: Sequence,
+    descending: bool,
+    sort_key: str,
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """AsyncSession version of fetch_page"""
+    statement = order_by_keys(statement, sort_columns, descending)
+    if cursor or page <= 1:
+        rows = (await db.execute(apply_cursor(statement, sort_columns, descending, sort_key, cursor, limit))).all()
+        return split_page(rows, limit, sort_key)
+    items = (await db.execute(statement.offset((page - 1) * limit).limit(limit))).scalars().all()
+    return items, None
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next cursor on a bare-list response"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+class PageTotal(NamedTuple):
+    value: int
+    exact: bool = True
+
+
+def set_total_count(response: Response, total: PageTotal) -> None:
+    """Expose the total on a bare-list response"""
+    response.headers[TOTAL_COUNT_HEADER] = str(total.value)
+    if not total.exact:
+        response.headers[TOTAL_ESTIMATED_HEADER] = "true"
+
+
+class PageTotals:
+    """Totals for paginated lists without a separate COUNT on every request.
+
+    Lists over tables the planner estimates at no more than `exact_max_rows`
+    get an exact total from count(*) OVER () in the page query itself. Lists
+    over larger tables run one COUNT and reuse it for `ttl` seconds, or
+    until a write calls invalidate(table); unfiltered lists on large tables
+    may use the planner's row estimate instead. Totals are keyed by a tuple
+    starting with the table name, e.g. ("events", "upcoming").
+    """
+
+    def __init__(self, exact_max_rows: int, ttl: float, max_entries: int = 10_000):
+        self.exact_max_rows = exact_max_rows
+        self._counts = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._estimates = LRUCache(max_entries=256, ttl=ttl)
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, so a count taken before a write is
+        # not stored after that write invalidated it
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def cached(self, key: Tuple) -> Optional[int]:
+        return self._counts.get(key)
+
+    def store(self, key: Tuple, total: int, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._counts.set(key, total)
+
+    def cached_estimate(self, table: str) -> Optional[int]:
+        return self._estimates.get(table)
+
+    def store_estimate(self, table: str, estimate: Optional[float]) -> int:
+        # reltuples is -1 for tables that were never analyzed; treat as small
+        estimate = max(int(estimate or 0), 0)
+        self._estimates.set(table, estimate)
+        return estimate
+
+    def invalidate(self, *tables: str) -> int:
+        """Drop the cached totals of lists over any of the tables"""
+        tables = frozenset(tables)
+        with self._lock:
+            self._generation += 1
+            return self._counts.discard_where(lambda key, _: key[0] in tables)
+
+    def stats(self) -> dict:
+        return self._counts.stats()
+
+
+page_totals = PageTotals(
+    exact_max_rows=settings.PAGINATION_EXACT_TOTAL_MAX_ROWS,
+    ttl=settings.PAGINATION_TOTAL_CACHE_SECONDS,
+)
+
+
+def _estimate_statement(table: str):
+    return text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)").bindparams(table=table)
+
+
+def _count_statement(statement: Select) -> Select:
+    return select(func.count()).select_from(statement.order_by(None).subquery())
+
+
+def _counted_page_statement(
+    statement: Select,
+    sort_columns: Sequence,
+    descending: bool,
+    sort_key: str,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+) -> Tuple[Select, bool]:
+    """Page query with the total as its second column; returns (statement, is_keyset)"""
+    statement = order_by_keys(statement, sort_columns, descending).add_columns(func.count().over().label("total_count"))
+    if cursor or page <= 1:
+        return apply_cursor(statement, sort_columns, descending, sort_key, cursor, limit), True
+    return statement.offset((page - 1) * limit).limit(limit), False
+
+
+def _split_counted_page(rows: Sequence, limit: int, sort_key: str, is_keyset: bool) -> Tuple[List[Any], Optional[str], Optional[int]]:
+    total = rows[0][1] if rows else None
+    if is_keyset:
+        items, next_cursor = split_page(rows, limit, sort_key, skip_columns=2)
+        return items, next_cursor, total
+    return [row[0] for row in rows], None, total
+
+
+def estimate_rows(db: Session, table: str) -> int:
+    """Planner row estimate for a table, cached like the totals"""
+    estimate = page_totals.cached_estimate(table)
+    if estimate is None:
+        estimate = page_totals.store_estimate(table, db.execute(_estimate_statement(table)).scalar())
+    return estimate
+
+
+async def estimate_rows_async(db: AsyncSession, table: str) -> int:
+    """AsyncSession version of estimate_rows"""
+    estimate = page_totals.cached_estimate(table)
+    if estimate is None:
+        estimate = page_totals.store_estimate(table, (await db.execute(_estimate_statement(table))).scalar())
+    return estimate
+
+
+def count_total(db: Session, statement: Select, total_key: Tuple[Hashable, ...], allow_estimate: bool = False) -> PageTotal:
+    """Total rows of an unordered statement: cached count, planner estimate or one COUNT"""
+    generation = page_totals.generation
+    total = page_totals.cached(total_key)
+    if total is not None:
+        return PageTotal(total)
+    if allow_estimate:
+        estimate = estimate_rows(db, total_key[0])
+        if estimate > page_totals.exact_max_rows:
+            return PageTotal(estimate, exact=False)
+    total = db.execute(_count_statement(statement)).scalar_one()
+    page_totals.store(total_key, total, generation)
+    return PageTotal(total)
+
+
+async def count_total_async(
+    db: AsyncSession, statement: Select, total_key: Tuple[Hashable, ...], allow_estimate: bool = False
+) -> PageTotal:
+    """AsyncSession version of count_total"""
+    generation = page_totals.generation
+    total = page_totals.cached(total_key)
+    if total is not None:
+        return PageTotal(total)
+    if allow_estimate:
+        estimate = await estimate_rows_async(db, total_key[0])
+        if estimate > page_totals.exact_max_rows:
+            return PageTotal(estimate, exact=False)
+    total = (await db.execute(_count_statement(statement))).scalar_one()
+    page_totals.store(total_key, total, generation)
+    return PageTotal(total)
+
+
+def fetch_page_with_total(
+    db: Session,
+    statement: Select,
+    sort_columns: Sequence,
+    descending: bool,
+    sort_key: str,
+    total_key: Tuple[Hashable, ...],
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    allow_estimate: bool = False,
+) -> Tuple[List[Any], Optional[str], PageTotal]:
+    """fetch_page that also returns the total number of matching rows (see PageTotals)"""
+    generation = page_totals.generation
+    # After a cursor the window would only count the remaining rows
+    if (
+        not cursor
+        and page_totals.cached(total_key) is None
+        and estimate_rows(db, total_key[0]) <= page_totals.exact_max_rows
+    ):
+        counted, is_keyset = _counted_page_statement(statement, sort_columns, descending, sort_key, page, limit, cursor)
+        items, next_cursor, total = _split_counted_page(db.execute(counted).all(), limit, sort_key, is_keyset)
+        # An empty page (past the end) carries no total
+        if total is not None:
+            page_totals.store(total_key, total, generation)
+            return items, next_cursor, PageTotal(total)
+    else:
+        items, next_cursor = fetch_page(db, statement, sort_columns, descending, sort_key, page, limit, cursor)
+    return items, next_cursor, count_total(db, statement, total_key, allow_estimate)
+
+
+async def fetch_page_with_total_async(
+    db: AsyncSession,
+    statement: Select,
+    sort_columns: Sequence,
+    descending: bool,
+    sort_key: str,
+    total_key: Tuple[Hashable, ...],
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    allow_estimate: bool = False,
+) -> Tuple[List[Any], Optional[str], PageTotal]:
+    """AsyncSession version of fetch_page_with_total"""
+    generation = page_totals.generation
+    if (
+        not cursor
+        and page_totals.cached(total_key) is None
+        and await estimate_rows_async(db, total_key[0]) <= page_totals.exact_max_rows
+    ):
+        counted, is_keyset = _counted_page_statement(statement, sort_columns, descending, sort_key, page, limit, cursor)
+        items, next_cursor, total = _split_counted_page((await db.execute(counted)).all(), limit, sort_key, is_keyset)
+        if total is not None:
+            page_totals.store(total_key, total, generation)
+            return items, next_cursor, PageTotal(total)
+    else:
+        items, next_cursor = await fetch_page_async(db, statement, sort_columns, descending, sort_key, page, limit, cursor)
+    return items, next_cursor, await count_total_async(db, statement, total_key, allow_estimate)
@@ -0,0 +1,138 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, List, Optional, Set
+
+from sqlalchemy import Select, Table, func, tablesample
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import ClauseAdapter
+
+from app.caching import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class IdSampler:
+    """Uniform random draws from in-memory pools of primary keys.
+
+    Each pool holds the ids matched by one id-only SELECT, so a draw costs one
+    random.sample and the caller's single `IN (...)` fetch instead of a scan
+    of the table. Result sets larger than `max_pool_size` are pooled as a
+    random subset, and all pools together hold at most `max_ids` ids.
+
+    Pools are loaded and refreshed on one background thread, one load per key
+    at a time; a stale pool keeps serving until its replacement is ready.
+    Draws without a pool (keys the caller does not pool, or pools still
+    loading) read a TABLESAMPLE of `sample_percent` of `table`'s pages.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        session_factory: Callable[[], Session],
+        refresh_seconds: float,
+        max_pool_size: int,
+        max_ids: int,
+        sample_percent: float,
+    ):
+        self.table = table
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self.max_pool_size = max_pool_size
+        self.sample_percent = sample_percent
+        # Sized by id count, so max_bytes bounds the ids held
+        self._pools = LRUCache(max_bytes=max_ids)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="random-sample-pools")
+        self._lock = threading.Lock()
+        self._loading: Set[Hashable] = set()
+        # Bumped by invalidate(); pools loaded under an older generation are stale
+        self._generation = 0
+        self.loads = 0
+        self.failed_loads = 0
+        self.table_samples = 0
+
+    def sample(self, db: Session, key: Optional[Hashable], statement: Select, count: int) -> List:
+        """Draw up to `count` distinct ids matching `statement`.
+
+        Ids come from the pool for `key`, loaded with `statement` in the
+        background; a key of None is never pooled.
+        """
+        entry = self._pools.get(key) if key is not None else None
+        if key is not None and (entry is None or self._is_stale(entry)):
+            self._load_soon(key, statement)
+        if entry is None:
+            return self.sample_table(db, statement, count)
+        pool = entry[2]
+        return random.sample(pool, min(count, len(pool)))
+
+    def sample_table(self, db: Session, statement: Select, count: int) -> List:
+        """Draw up to `count` ids matching `statement` from a TABLESAMPLE of the table.
+
+        When the sampled pages hold fewer than `count` matches, the filter is
+        rare enough to draw from all of its matches instead.
+        """
+        with self._lock:
+            self.table_samples += 1
+        sampled = tablesample(self.table, func.system(self.sample_percent))
+        candidates = db.execute(ClauseAdapter(sampled).traverse(statement)).scalars().all()
+        if len(candidates) < count:
+            return list(db.execute(statement.order_by(func.random()).limit(count)).scalars())
+        return random.sample(candidates, count)
+
+    def _is_stale(self, entry) -> bool:
+        generation, loaded_at, _ = entry
+        return generation != self._generation or time.monotonic() - loaded_at > self.refresh_seconds
+
+    def _load_soon(self, key: Hashable, statement: Select) -> None:
+        with self._lock:
+            if key in self._loading:
+                return
+            self._loading.add(key)
+            generation = self._generation
+        try:
+            self._executor.submit(self._load, key, statement, generation)
+        except RuntimeError:
+            # Shutting down
+            with self._lock:
+                self._loading.discard(key)
+
+    def _load(self, key: Hashable, statement: Select, generation: int) -> None:
+        try:
+            with self.session_factory() as db:
+                pool = tuple(db.execute(statement.limit(self.max_pool_size + 1)).scalars())
+                if len(pool) > self.max_pool_size:
+                    pool = tuple(db.execute(statement.order_by(func.random()).limit(self.max_pool_size)).scalars())
+            # A pool loaded across an invalidate() keeps the older generation and is reloaded on next use
+            self._pools.set(key, (generation, time.monotonic(), pool), size=len(pool))
+            with self._lock:
+                self.loads += 1
+        except Exception as e:
+            logger.exception(f"Loading the random sample pool for {key!r} failed: {str(e)}")
+            with self._lock:
+                self.failed_loads += 1
+        finally:
+            with self._lock:
+                self._loading.discard(key)
+
+    def invalidate(self) -> None:
+        """Mark every pool stale, e.g. after items were added or removed; each reloads on its next use"""
+        with self._lock:
+            self._generation += 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        pools = self._pools.stats()
+        return {
+            "pools": pools["entries"],
+            "ids": pools["bytes"],
+            "hits": pools["hits"],
+            "misses": pools["misses"],
+            "evictions": pools["evictions"],
+            "loads": self.loads,
+            "failed_loads": self.failed_loads,
+            "table_samples": self.table_samples,
+        }
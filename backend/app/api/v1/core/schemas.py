@@ -1,9 +1,9 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, computed_field, validator
 import uuid
 
 
@@ -82,6 +82,8 @@ class UserUpdate(BaseModel):
 
 class UserOutSchema(UserBase):
     id: UUID
+    profile_image: Optional[str] = None
+    profile_image_variants: Optional[Dict[str, Dict[str, str]]] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -256,6 +258,7 @@ class CommentBase(BaseModel):
 class CommentCreate(BaseModel):
     text: str = Field(..., max_length=500)
     cultural_item_id: UUID
+    parent_comment_id: Optional[UUID] = None
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -263,9 +266,27 @@ class CommentSchema(CommentBase):
     id: UUID
     created_at: datetime
     user_id: Optional[UUID] = None
+    parent_comment_id: Optional[UUID] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CommentAuthor(BaseModel):
+    id: UUID
+    username: str
+    profile_image: Optional[str] = None
+
     model_config = ConfigDict(from_attributes=True)
 
 
+class CommentThread(CommentSchema):
+    author: Optional[CommentAuthor] = None
+    depth: int = 0
+    reply_count: int = 0  # Direct replies, including those not returned
+    replies: List["CommentThread"] = []
+    # Pass to /comments/{id}/replies for the replies after the last one returned
+    replies_cursor: Optional[str] = None
+
+
 ### CULTURAL ITEM SCHEMAS
 class MediaBase(BaseModel):
     url: str
@@ -326,6 +347,8 @@ class CulturalItem(CulturalItemBase):
     id: UUID
     created_at: datetime
     updated_at: datetime
+    source: str = "manual"
+    external_id: Optional[str] = None
     tags: List[Tag] = []
 
     model_config = ConfigDict(from_attributes=True)
@@ -337,6 +360,47 @@ class CulturalItemDetail(CulturalItem):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class CulturalItemFacets(BaseModel):
+    total: int  # Items matching the filters
+    region: List[FacetCount] = []
+    time_period: List[FacetCount] = []
+    is_featured: List[FacetCount] = []  # Values "true" / "false"
+    tag: List[FacetCount] = []
+
+
+class DataSourceStats(BaseModel):
+    total_items: int
+    getty_items: int
+    other_items: int
+    sources: Dict[str, int]
+
+
+class IngestRequest(BaseModel):
+    path: str  # Relative to INGEST_DIR on the server
+    format: Optional[Literal["ndjson", "csv"]] = None  # Default: from the file extension
+    source: Optional[str] = Field(None, max_length=50)  # For records that do not name their source
+    resume: bool = True  # Continue after the last checkpoint instead of loading the whole file
+
+
+class IngestJob(BaseModel):
+    id: str
+    path: str
+    status: str
+    records: int
+    resumed_from: int
+    inserted: int
+    duplicates: int
+    rejected: int
+    tags_created: int
+    seconds: float
+    error: Optional[str] = None
+
+
 ### ARTIFACT SCHEMAS
 class ArtifactSchema(BaseModel):
     id: int
@@ -447,6 +511,25 @@ class BlogAuthor(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BlogPostSummary(BaseModel):
+    """A blog post as listed: an excerpt instead of the content"""
+    id: UUID
+    title: str
+    excerpt: Optional[str] = None
+    category_name: str
+    created_at: datetime
+    updated_at: datetime
+    author_id: UUID
+    author: BlogAuthor
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def category(self) -> dict:
+        return {"id": self.category_name, "name": self.category_name}
+
+
 class CategoryResponse(BaseModel):
     id: UUID
     name: str
@@ -460,6 +543,8 @@ class BlogPostResponse(BlogPostBase):
     updated_at: datetime
     author_id: UUID
     author: BlogAuthor
+    excerpt: Optional[str] = None
+    content_html: Optional[str] = None  # Sanitized HTML of the markdown content
     category: dict = None  # Change from property to field with default None
 
     model_config = ConfigDict(
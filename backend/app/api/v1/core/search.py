@@ -0,0 +1,50 @@
+import re
+from typing import Optional
+
+from sqlalchemy import Numeric, Select, cast, func, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from app.api.v1.core.models import CulturalItem
+
+# Text search configuration used for both the stored vectors and the queries
+SEARCH_CONFIG = "english"
+
+# Letters and digits only, so user input can never produce tsquery syntax errors
+_TERM_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """Turn free text into a prefix-matching tsquery, e.g. 'greek amph' -> 'greek:* & amph:*'"""
+    terms = _TERM_PATTERN.findall(query.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def search_rank(query: str):
+    """Relevance of an item for the query, weighted by the search vector weights.
+
+    Cast to numeric so the value survives a round trip through a pagination cursor.
+    """
+    tsquery = func.to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), build_tsquery(query))
+    return cast(func.ts_rank_cd(CulturalItem.search_vector, tsquery), Numeric)
+
+
+def search_condition(query: str):
+    """WHERE clause matching items against the query; served by the GIN index"""
+    tsquery = func.to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), build_tsquery(query))
+    return CulturalItem.search_vector.op("@@")(tsquery)
+
+
+def search_statement(query: str) -> Optional[Select]:
+    """Select matching items in relevance order, or None if the query has no searchable terms.
+
+    Ties are broken by creation date and id so that pagination is stable.
+    """
+    if build_tsquery(query) is None:
+        return None
+    return (
+        select(CulturalItem)
+        .where(search_condition(query))
+        .order_by(search_rank(query).desc(), CulturalItem.created_at.desc(), CulturalItem.id.desc())
+    )
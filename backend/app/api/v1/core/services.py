@@ -1,7 +1,11 @@
-from typing import List, Optional
+import logging
+import re
+from typing import List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy import Select, String, and_, cast, exists, false, func, literal, null, select, true, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.api.v1.core.models import (
     CulturalItem,
@@ -10,75 +14,279 @@ from app.api.v1.core.models import (
     cultural_item_tag,
     Category,
     Event,
+    Notification,
+    NotificationCounter,
+    Comment,
+    MANUAL_SOURCE,
+    SourceItemCount,
+    BlogCategoryCount,
+    BlogPost,
 )
 from app.api.v1.core.schemas import (
+    CommentAuthor,
+    CommentThread,
     CulturalItemCreate,
     CulturalItemUpdate,
     MediaCreate,
 )
+from app.api.v1.core.sampling import IdSampler
+from app.api.v1.core.pagination import (
+    PageTotal,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+    fetch_page_async,
+    fetch_page_with_total,
+    fetch_page_with_total_async,
+    order_by_keys,
+    page_totals,
+)
+from app.api.v1.core.search import build_tsquery, search_condition, search_rank, search_statement
+from app.db_setup import SessionLocal
+from app.fanout import notification_fanout, notify_item_updated
+from app.response_cache import response_cache
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Relationships serialized by the CulturalItem and CulturalItemDetail schemas.
+# Collections use selectinload (one extra IN query per page instead of one
+# query per item, and required for AsyncSession, which cannot lazy-load).
+CULTURAL_ITEM_LOADERS = (selectinload(CulturalItem.tags),)
+# A single item can join its tags in the same query
+CULTURAL_ITEM_DETAIL_LOADERS = (joinedload(CulturalItem.tags), selectinload(CulturalItem.media))
+
+def filter_cultural_items_query(
+    query: Optional[str] = None,
+    region: Optional[str] = None,
+    time_period: Optional[str] = None,
+    is_featured: Optional[bool] = None,
+    tag_name: Optional[str] = None,
+    statement: Optional[Select] = None,
+    source: Optional[str] = None,
+) -> Select:
+    """Build an unordered cultural item SELECT with every filter applied in SQL.
+
+    Filters are added to `statement` when given, e.g. select(CulturalItem.id).
+    """
+    if statement is None:
+        statement = select(CulturalItem).options(*CULTURAL_ITEM_LOADERS)
+    if query:
+        if build_tsquery(query) is None:
+            statement = statement.where(false())
+        else:
+            statement = statement.where(search_condition(query))
+    if region:
+        statement = statement.where(CulturalItem.region.ilike(f"%{region}%"))
+    if time_period:
+        statement = statement.where(CulturalItem.time_period.ilike(f"%{time_period}%"))
+    if is_featured is not None:
+        statement = statement.where(CulturalItem.is_featured == is_featured)
+    if tag_name:
+        statement = statement.where(CulturalItem.tags.any(Tag.name == tag_name))
+    if source:
+        statement = statement.where(CulturalItem.source == source)
+    return statement
+
+def get_cultural_item_facets(db: Session, limit: int = 20, **filters) -> dict:
+    """Count the items matching `filters` per region, time period, tag and featured flag in one query.
+
+    Returns {"total": n, facet: [(value, count), ...]} with the `limit` most
+    frequent values of each facet.
+    """
+    matched = filter_cultural_items_query(
+        **filters,
+        statement=select(CulturalItem.id, CulturalItem.region, CulturalItem.time_period, CulturalItem.is_featured),
+    ).cte("matched")
+    count = func.count().label("count")
+
+    def facet(name: str, value, statement: Select) -> Select:
+        grouped = (
+            statement.add_columns(literal(name).label("facet"), cast(value, String).label("value"), count)
+            .where(value.is_not(None))
+            .group_by(value)
+            .order_by(count.desc(), value)
+            .limit(limit)
+            .subquery()
+        )
+        return select(grouped.c.facet, grouped.c.value, grouped.c.count)
+
+    statement = union_all(
+        select(literal("total").label("facet"), cast(null(), String).label("value"), func.count().label("count")).select_from(matched),
+        facet("region", matched.c.region, select().select_from(matched)),
+        facet("time_period", matched.c.time_period, select().select_from(matched)),
+        facet("is_featured", matched.c.is_featured, select().select_from(matched)),
+        facet(
+            "tag",
+            Tag.name,
+            select().select_from(matched)
+            .join(cultural_item_tag, cultural_item_tag.c.cultural_item_id == matched.c.id)
+            .join(Tag, Tag.id == cultural_item_tag.c.tag_id),
+        ),
+    )
+    facets = {"total": 0, "region": [], "time_period": [], "is_featured": [], "tag": []}
+    for row in db.execute(statement):
+        if row.facet == "total":
+            facets["total"] = row.count
+        else:
+            facets[row.facet].append((row.value, row.count))
+    return facets
+
+def cultural_items_sort(
+    query: Optional[str] = None,
+    sort_by: Optional[str] = "created_at",
+    sort_order: Optional[str] = "desc",
+) -> Tuple[str, list, bool]:
+    """Resolve a sort request into (sort key, sort columns, descending).
+
+    Every sort ends with id as tie-breaker and is backed by a composite index,
+    so it can be used both for ORDER BY and for keyset pagination.
+    """
+    # Relevance only makes sense with a search query
+    if sort_by == "relevance" and query and build_tsquery(query) is not None:
+        return "relevance", [search_rank(query), CulturalItem.created_at, CulturalItem.id], True
+    descending = (sort_order or "desc").lower() != "asc"
+    direction = "desc" if descending else "asc"
+    if sort_by == "title":
+        return f"title:{direction}", [func.lower(CulturalItem.title), CulturalItem.id], descending
+    return f"created_at:{direction}", [CulturalItem.created_at, CulturalItem.id], descending
+
+def build_cultural_items_query(
+    query: Optional[str] = None,
+    region: Optional[str] = None,
+    time_period: Optional[str] = None,
+    is_featured: Optional[bool] = None,
+    tag_name: Optional[str] = None,
+    sort_by: Optional[str] = "created_at",
+    sort_order: Optional[str] = "desc",
+) -> Select:
+    """Build a cultural item SELECT with every filter and sort applied in SQL"""
+    statement = filter_cultural_items_query(query, region, time_period, is_featured, tag_name)
+    _, sort_columns, descending = cultural_items_sort(query, sort_by, sort_order)
+    return order_by_keys(statement, sort_columns, descending)
+
+def list_cultural_items(db: Session, skip: int = 0, limit: int = 100, **filters) -> List[CulturalItem]:
+    """Fetch exactly one page of cultural items; filters are those of build_cultural_items_query"""
+    statement = build_cultural_items_query(**filters).offset(skip).limit(limit)
+    return db.execute(statement).scalars().all()
+
+def get_cultural_items_page(
+    db: Session,
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = "created_at",
+    sort_order: Optional[str] = "desc",
+    **filters,
+) -> Tuple[List[CulturalItem], Optional[str]]:
+    """Fetch one page of cultural items and the cursor of the next page"""
+    statement = filter_cultural_items_query(**filters)
+    sort_key, sort_columns, descending = cultural_items_sort(filters.get("query"), sort_by, sort_order)
+    return fetch_page(db, statement, sort_columns, descending, sort_key, page=page, limit=limit, cursor=cursor)
+
+async def get_cultural_items_page_async(
+    db: AsyncSession,
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = "created_at",
+    sort_order: Optional[str] = "desc",
+    **filters,
+) -> Tuple[List[CulturalItem], Optional[str], PageTotal]:
+    """AsyncSession version of get_cultural_items_page that also returns the total"""
+    statement = filter_cultural_items_query(**filters)
+    sort_key, sort_columns, descending = cultural_items_sort(filters.get("query"), sort_by, sort_order)
+    # Unfiltered lists on large catalogs may report the planner's estimate
+    total_key = ("cultural_items", tuple(sorted(filters.items())))
+    return await fetch_page_with_total_async(
+        db, statement, sort_columns, descending, sort_key, total_key,
+        page=page, limit=limit, cursor=cursor, allow_estimate=all(value in (None, "") for value in filters.values()),
+    )
 
 def get_cultural_items(db: Session, skip: int = 0, limit: int = 100) -> List[CulturalItem]:
-    """Get cultural items with improved querying and debugging"""
+    """Get cultural items, newest first"""
     try:
-        # First check if there are any items in the database
-        count = db.query(func.count(CulturalItem.id)).scalar()
-        print(f"Total cultural items in database: {count}")
-        
-        # If no items found, log this for debugging
-        if count == 0:
-            print("WARNING: No cultural items found in database!")
-            return []
-        
-        # Apply pagination with a larger limit if needed
-        if count < 100:
-            # If fewer than 100 items, return all of them
-            result = db.query(CulturalItem).all()
-        else:
-            # Otherwise paginate normally
-            result = db.query(CulturalItem).offset(skip).limit(limit).all()
-        
-        print(f"Retrieved {len(result)} cultural items")
+        result = list_cultural_items(db, skip=skip, limit=limit)
+        logger.debug(f"Retrieved {len(result)} cultural items")
         return result
     except Exception as e:
-        print(f"Error retrieving cultural items: {str(e)}")
+        logger.exception(f"Error retrieving cultural items: {str(e)}")
         # Return empty list on error rather than raising exception
         # This prevents the API from crashing but logs the error
         return []
 
 def search_cultural_items(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[CulturalItem]:
-    search = f"%{query}%"
-    return db.query(CulturalItem).filter(
-        or_(
-            CulturalItem.title.ilike(search),
-            CulturalItem.description.ilike(search),
-            CulturalItem.region.ilike(search),
-            CulturalItem.time_period.ilike(search),
-            CulturalItem.historical_significance.ilike(search)
-        )
-    ).offset(skip).limit(limit).all()
+    """Full-text search over cultural items, best matches first"""
+    statement = search_statement(query)
+    if statement is None:
+        return []
+    statement = statement.options(*CULTURAL_ITEM_LOADERS).offset(skip).limit(limit)
+    return db.execute(statement).scalars().all()
 
 def get_all_tags(db: Session, skip: int = 0, limit: int = 100) -> List[Tag]:
-    return db.query(Tag).offset(skip).limit(limit).all()
+    return db.query(Tag).order_by(Tag.name).offset(skip).limit(limit).all()
 
-def get_cultural_items_by_tag(db: Session, tag_name: str, skip: int = 0, limit: int = 100) -> List[CulturalItem]:
-    tag = db.query(Tag).filter(Tag.name == tag_name).first()
-    if not tag:
-        return []
-    return tag.cultural_items[skip:skip + limit]
+def get_tags_page(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Tag], Optional[str]]:
+    """Fetch tags by name with keyset pagination"""
+    return fetch_page(db, select(Tag), [Tag.name], False, "name:asc", limit=limit, cursor=cursor)
 
-def get_cultural_items_by_region(db: Session, region: str, skip: int = 0, limit: int = 100) -> List[CulturalItem]:
-    return db.query(CulturalItem).filter(CulturalItem.region.ilike(f"%{region}%")).offset(skip).limit(limit).all()
+def get_cultural_items_by_tag(db: Session, tag_name: str, skip: int = 0, limit: int = 100, **filters) -> List[CulturalItem]:
+    return list_cultural_items(db, skip=skip, limit=limit, tag_name=tag_name, **filters)
 
-def get_cultural_items_by_time_period(db: Session, time_period: str, skip: int = 0, limit: int = 100) -> List[CulturalItem]:
-    return db.query(CulturalItem).filter(CulturalItem.time_period.ilike(f"%{time_period}%")).offset(skip).limit(limit).all()
+def get_cultural_items_by_region(db: Session, region: str, skip: int = 0, limit: int = 100, **filters) -> List[CulturalItem]:
+    return list_cultural_items(db, skip=skip, limit=limit, region=region, **filters)
+
+def get_cultural_items_by_time_period(db: Session, time_period: str, skip: int = 0, limit: int = 100, **filters) -> List[CulturalItem]:
+    return list_cultural_items(db, skip=skip, limit=limit, time_period=time_period, **filters)
 
 def get_featured_cultural_items(db: Session, skip: int = 0, limit: int = 10) -> List[CulturalItem]:
     """Get cultural items that are marked as featured."""
-    return db.query(CulturalItem).filter(CulturalItem.is_featured == True).offset(skip).limit(limit).all()
+    return list_cultural_items(db, skip=skip, limit=limit, is_featured=True)
+
+async def get_featured_cultural_items_async(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[CulturalItem]:
+    """AsyncSession version of get_featured_cultural_items"""
+    statement = build_cultural_items_query(is_featured=True).offset(skip).limit(limit)
+    return (await db.execute(statement)).scalars().all()
+
+random_item_sampler = IdSampler(
+    CulturalItem.__table__,
+    SessionLocal,
+    refresh_seconds=settings.RANDOM_SAMPLE_REFRESH_SECONDS,
+    max_pool_size=settings.RANDOM_SAMPLE_POOL_MAX,
+    max_ids=settings.RANDOM_SAMPLE_MAX_IDS,
+    sample_percent=settings.RANDOM_SAMPLE_TABLESAMPLE_PERCENT,
+)
+
+def get_random_cultural_items(
+    db: Session,
+    count: int,
+    is_featured: Optional[bool] = None,
+    region: Optional[str] = None,
+) -> List[CulturalItem]:
+    """Draw `count` items uniformly at random from the whole (filtered) catalog"""
+    # Region matching is case-insensitive, so share one pool per spelling
+    region = region.strip().lower() if region else None
+    id_statement = filter_cultural_items_query(region=region, is_featured=is_featured, statement=select(CulturalItem.id))
+    # Only configured regions get pools, so clients cannot grow them
+    pool_key = (is_featured, region) if region is None or region in settings.RANDOM_SAMPLE_REGIONS else None
+    ids = random_item_sampler.sample(db, pool_key, id_statement, count)
+    if not ids:
+        return []
+    statement = select(CulturalItem).where(CulturalItem.id.in_(ids)).options(*CULTURAL_ITEM_LOADERS)
+    items = {item.id: item for item in db.execute(statement).scalars()}
+    if len(items) < len(ids):
+        # Some sampled items were deleted since their pool was loaded
+        random_item_sampler.invalidate()
+    return [items[item_id] for item_id in ids if item_id in items]
 
 def get_cultural_item(db: Session, cultural_item_id: UUID) -> Optional[CulturalItem]:
     return db.query(CulturalItem).filter(CulturalItem.id == cultural_item_id).first()
 
+def get_cultural_item_detail(db: Session, cultural_item_id: UUID) -> Optional[CulturalItem]:
+    """Get an item with the tags and media serialized by CulturalItemDetail"""
+    statement = select(CulturalItem).where(CulturalItem.id == cultural_item_id).options(*CULTURAL_ITEM_DETAIL_LOADERS)
+    return db.execute(statement).unique().scalar_one_or_none()
+
 def create_cultural_item(db: Session, item: CulturalItemCreate) -> CulturalItem:
     # Extract tag IDs to associate with the cultural item
     tag_ids = item.tag_ids if hasattr(item, 'tag_ids') else []
@@ -93,7 +301,8 @@ def create_cultural_item(db: Session, item: CulturalItemCreate) -> CulturalItem:
         video_url=item.video_url,
         audio_url=item.audio_url,
         historical_significance=item.historical_significance,
-        is_featured=item.is_featured if hasattr(item, 'is_featured') else False
+        is_featured=item.is_featured if hasattr(item, 'is_featured') else False,
+        source=MANUAL_SOURCE,
     )
     
     # Add tags
@@ -102,8 +311,12 @@ def create_cultural_item(db: Session, item: CulturalItemCreate) -> CulturalItem:
         db_item.tags = tags
     
     db.add(db_item)
+    adjust_source_count(db, db_item.source, 1)
     db.commit()
     db.refresh(db_item)
+    response_cache.invalidate("cultural_items")
+    page_totals.invalidate("cultural_items")
+    random_item_sampler.invalidate()
     return db_item
 
 def create_media(db: Session, media: MediaCreate) -> Media:
@@ -117,12 +330,14 @@ def create_media(db: Session, media: MediaCreate) -> Media:
     db.add(db_media)
     db.commit()
     db.refresh(db_media)
+    response_cache.invalidate("cultural_items")
     return db_media
 
 def update_cultural_item(db: Session, cultural_item_id: UUID, item: CulturalItemUpdate, current_user=None) -> Optional[CulturalItem]:
     db_item = get_cultural_item(db, cultural_item_id)
     if not db_item:
         return None
+    sampled_fields = (db_item.is_featured, db_item.region)
     
     # Update fields
     for key, value in item.dict(exclude_unset=True).items():
@@ -136,6 +351,12 @@ def update_cultural_item(db: Session, cultural_item_id: UUID, item: CulturalItem
     
     db.commit()
     db.refresh(db_item)
+    response_cache.invalidate("cultural_items")
+    page_totals.invalidate("cultural_items")
+    if (db_item.is_featured, db_item.region) != sampled_fields:
+        # The random sample pools are keyed by these
+        random_item_sampler.invalidate()
+    notification_fanout.submit(notify_item_updated, db_item.id, current_user.id if current_user else None)
     return db_item
 
 def delete_cultural_item(db: Session, cultural_item_id: UUID) -> bool:
@@ -144,39 +365,135 @@ def delete_cultural_item(db: Session, cultural_item_id: UUID) -> bool:
         return False
     
     db.delete(db_item)
+    adjust_source_count(db, db_item.source, -1)
     db.commit()
+    response_cache.invalidate("cultural_items")
+    page_totals.invalidate("cultural_items")
+    random_item_sampler.invalidate()
     return True
 
+def adjust_source_count(db: Session, source: str, delta: int) -> None:
+    """Add `delta` to the item counter of a source; the caller commits"""
+    if not delta:
+        return
+    statement = pg_insert(SourceItemCount).values(source=source, item_count=max(delta, 0))
+    statement = statement.on_conflict_do_update(
+        index_elements=[SourceItemCount.source],
+        set_={
+            "item_count": func.greatest(SourceItemCount.item_count + delta, 0),
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+
 def get_data_source_statistics(db: Session) -> dict:
-    """Get statistics about data sources in the database"""
-    total_items = db.query(func.count(CulturalItem.id)).scalar()
-    
-    # Count items that likely came from Getty (based on URL pattern)
-    getty_items = db.query(func.count(CulturalItem.id)).filter(
-        CulturalItem.image_url.like('%getty.edu%')
-    ).scalar()
-    
-    # Count mock/other items
-    other_items = total_items - getty_items
-    
+    """Get statistics about data sources in the database, read from the per-source counters"""
+    counts = dict(db.execute(select(SourceItemCount.source, SourceItemCount.item_count)).all())
+    total_items = sum(counts.values())
+    getty_items = counts.get("getty", 0)
     return {
         "total_items": total_items,
         "getty_items": getty_items,
-        "other_items": other_items
+        "other_items": total_items - getty_items,
+        "sources": counts,
     }
 
-def get_cultural_items_by_source(db: Session, source: str, skip: int = 0, limit: int = 100) -> List[CulturalItem]:
-    """Get cultural items filtered by their data source"""
-    if source.lower() == 'getty':
-        return db.query(CulturalItem).filter(
-            CulturalItem.image_url.like('%getty.edu%')
-        ).offset(skip).limit(limit).all()
-    elif source.lower() == 'mock':
-        return db.query(CulturalItem).filter(
-            ~CulturalItem.image_url.like('%getty.edu%')
-        ).offset(skip).limit(limit).all()
-    else:
-        return get_cultural_items(db, skip, limit)
+def get_cultural_items_by_source(
+    db: Session, source: str, page: int = 1, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[CulturalItem], Optional[str]]:
+    """Get a page of cultural items loaded from `source`, newest first"""
+    return get_cultural_items_page(db, page=page, limit=limit, cursor=cursor, source=source.lower())
+
+def reconcile_source_counts(db: Session) -> int:
+    """Rewrite every source counter that drifted from the items table; returns how many were fixed"""
+    actual = (
+        select(CulturalItem.source, func.count().label("items"), func.now())
+        .group_by(CulturalItem.source)
+    )
+    upsert = pg_insert(SourceItemCount).from_select(["source", "item_count", "updated_at"], actual)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[SourceItemCount.source],
+        set_={"item_count": upsert.excluded.item_count, "updated_at": func.now()},
+        where=SourceItemCount.item_count != upsert.excluded.item_count,
+    )
+    fixed = db.execute(upsert).rowcount
+    # Sources whose items are all gone
+    fixed += db.execute(
+        update(SourceItemCount)
+        .where(
+            SourceItemCount.item_count != 0,
+            ~exists().where(CulturalItem.source == SourceItemCount.source),
+        )
+        .values(item_count=0, updated_at=func.now())
+    ).rowcount
+    db.commit()
+    return fixed
+
+# Blog list excerpts: plain text with markdown links reduced to their text
+EXCERPT_LENGTH = 200
+_MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKDOWN_PUNCTUATION = re.compile(r"[#*_`>~]")
+_WHITESPACE = re.compile(r"\s+")
+
+def make_excerpt(content: str, length: int = EXCERPT_LENGTH) -> str:
+    """Plain-text start of a markdown post, cut at a word boundary to at most `length` characters"""
+    text = _MARKDOWN_LINK.sub(r"\1", content or "")
+    text = _WHITESPACE.sub(" ", _MARKDOWN_PUNCTUATION.sub("", text)).strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip() + "…"
+
+def adjust_blog_category_count(db: Session, category_name: str, delta: int) -> None:
+    """Add `delta` to the post counter of a blog category; the caller commits"""
+    if not delta:
+        return
+    statement = pg_insert(BlogCategoryCount).values(category_name=category_name, post_count=max(delta, 0))
+    statement = statement.on_conflict_do_update(
+        index_elements=[BlogCategoryCount.category_name],
+        set_={
+            "post_count": func.greatest(BlogCategoryCount.post_count + delta, 0),
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+
+def get_blog_category_counts(db: Session) -> List[Tuple[str, int]]:
+    """(category name, post count) of every category with posts, by name"""
+    return db.execute(
+        select(BlogCategoryCount.category_name, BlogCategoryCount.post_count)
+        .where(BlogCategoryCount.post_count > 0)
+        .order_by(BlogCategoryCount.category_name)
+    ).all()
+
+def reconcile_blog_category_counts(db: Session) -> int:
+    """Rewrite every blog category counter that drifted from the posts; returns how many were fixed"""
+    actual = (
+        select(BlogPost.category_name, func.count().label("posts"), func.now())
+        .group_by(BlogPost.category_name)
+    )
+    upsert = pg_insert(BlogCategoryCount).from_select(["category_name", "post_count", "updated_at"], actual)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[BlogCategoryCount.category_name],
+        set_={"post_count": upsert.excluded.post_count, "updated_at": func.now()},
+        where=BlogCategoryCount.post_count != upsert.excluded.post_count,
+    )
+    fixed = db.execute(upsert).rowcount
+    # Categories whose posts are all gone
+    fixed += db.execute(
+        update(BlogCategoryCount)
+        .where(
+            BlogCategoryCount.post_count != 0,
+            ~exists().where(BlogPost.category_name == BlogCategoryCount.category_name),
+        )
+        .values(post_count=0, updated_at=func.now())
+    ).rowcount
+    db.commit()
+    if fixed:
+        response_cache.invalidate("blog_categories")
+    return fixed
 
 def get_all_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
     """Get all blog post categories"""
@@ -217,3 +534,268 @@ def get_past_events(db: Session, skip: int = 0, limit: int = 100) -> List[Event]
     from datetime import datetime
     now = datetime.utcnow()
     return db.query(Event).filter(Event.start_date <= now).order_by(Event.start_date.desc()).offset(skip).limit(limit).all()
+
+def events_page_query(filter_type: Optional[str] = None) -> Tuple[Select, list, bool, str]:
+    """Resolve an event filter (upcoming, past or all) into (statement, sort columns, descending, sort key)"""
+    from datetime import datetime
+    now = datetime.utcnow()
+    if filter_type == "upcoming":
+        statement = select(Event).where(Event.start_date > now)
+        descending = False
+    elif filter_type == "past":
+        statement = select(Event).where(Event.start_date <= now)
+        descending = True
+    else:
+        filter_type = "all"
+        statement = select(Event)
+        descending = False
+    return statement, [Event.start_date, Event.id], descending, f"start_date:{filter_type}"
+
+def get_events_page(
+    db: Session,
+    filter_type: Optional[str] = None,
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Event], Optional[str], PageTotal]:
+    """Get one page of events (upcoming, past or all), the cursor of the next page and the exact total"""
+    statement, sort_columns, descending, sort_key = events_page_query(filter_type)
+    return fetch_page_with_total(
+        db, statement, sort_columns, descending, sort_key, ("events", sort_key), page=page, limit=limit, cursor=cursor
+    )
+
+async def get_events_page_async(
+    db: AsyncSession,
+    filter_type: Optional[str] = None,
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Event], Optional[str], PageTotal]:
+    """AsyncSession version of get_events_page"""
+    statement, sort_columns, descending, sort_key = events_page_query(filter_type)
+    return await fetch_page_with_total_async(
+        db, statement, sort_columns, descending, sort_key, ("events", sort_key), page=page, limit=limit, cursor=cursor
+    )
+
+# Unread notification counters. Every change to a notification's unread state
+# adjusts notification_counters in the same transaction, so the unread count
+# is a primary-key lookup instead of a COUNT over the user's notifications.
+
+def adjust_unread_count(db: Session, user_id: UUID, delta: int) -> None:
+    """Add `delta` to a user's unread counter; the caller commits"""
+    if not delta:
+        return
+    statement = pg_insert(NotificationCounter).values(user_id=user_id, unread_count=max(delta, 0))
+    statement = statement.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            "unread_count": func.greatest(NotificationCounter.unread_count + delta, 0),
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+
+def create_notification(
+    db: Session,
+    user_id: UUID,
+    message: str,
+    notification_type: str,
+    cultural_item_id: Optional[UUID] = None,
+    comment_id: Optional[UUID] = None,
+) -> Notification:
+    notification = Notification(
+        user_id=user_id,
+        message=message,
+        notification_type=notification_type,
+        cultural_item_id=cultural_item_id,
+        comment_id=comment_id,
+    )
+    db.add(notification)
+    db.flush()
+    adjust_unread_count(db, user_id, 1)
+    db.commit()
+    db.refresh(notification)
+    page_totals.invalidate("notifications")
+    return notification
+
+def set_notification_read(db: Session, notification: Notification, is_read: bool) -> Notification:
+    """Mark one notification read or unread"""
+    # Conditional UPDATE, so concurrent requests flipping the same
+    # notification adjust the counter only once
+    result = db.execute(
+        update(Notification)
+        .where(Notification.id == notification.id, Notification.is_read != is_read)
+        .values(is_read=is_read)
+    )
+    if result.rowcount:
+        adjust_unread_count(db, notification.user_id, -1 if is_read else 1)
+    db.commit()
+    db.refresh(notification)
+    page_totals.invalidate("notifications")
+    return notification
+
+def mark_all_notifications_read(db: Session, user_id: UUID) -> int:
+    result = db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False)
+        .values(is_read=True)
+    )
+    adjust_unread_count(db, user_id, -result.rowcount)
+    db.commit()
+    page_totals.invalidate("notifications")
+    return result.rowcount
+
+def delete_notification(db: Session, notification: Notification) -> None:
+    was_unread = not notification.is_read
+    db.delete(notification)
+    db.flush()
+    if was_unread:
+        adjust_unread_count(db, notification.user_id, -1)
+    db.commit()
+    page_totals.invalidate("notifications")
+
+async def get_unread_count_async(db: AsyncSession, user_id: UUID) -> int:
+    count = await db.scalar(select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id))
+    return count or 0
+
+def reconcile_unread_counts(db: Session) -> int:
+    """Rewrite every unread counter that drifted from its notifications; returns how many were fixed.
+
+    A counter adjusted by a write that commits while this runs may be
+    overwritten with the count from before it; the next run repairs it.
+    """
+    actual = (
+        select(Notification.user_id, func.count().label("unread"), func.now())
+        .where(Notification.is_read == False)
+        .group_by(Notification.user_id)
+    )
+    upsert = pg_insert(NotificationCounter).from_select(["user_id", "unread_count", "updated_at"], actual)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={"unread_count": upsert.excluded.unread_count, "updated_at": func.now()},
+        where=NotificationCounter.unread_count != upsert.excluded.unread_count,
+    )
+    fixed = db.execute(upsert).rowcount
+    # Users whose unread notifications are all gone
+    fixed += db.execute(
+        update(NotificationCounter)
+        .where(
+            NotificationCounter.unread_count != 0,
+            ~exists().where(and_(Notification.user_id == NotificationCounter.user_id, Notification.is_read == False)),
+        )
+        .values(unread_count=0, updated_at=func.now())
+    ).rowcount
+    db.commit()
+    return fixed
+
+# Threads are listed oldest first; top-level pages and reply pages share the cursor format
+COMMENT_THREAD_SORT_KEY = "comments:created_at:asc"
+
+def _comment_tree_rows(db: Session, roots: Select, limit: int, depth: int, replies_limit: int) -> list:
+    """Run one recursive CTE over a page of root comments and their replies down to `depth`.
+
+    `roots` selects the candidate root comments; the first limit+1 of them in
+    (created_at, id) order are taken and only the first `limit` are expanded,
+    the extra one just tells whether there is a next page. Each comment is
+    expanded to its first `replies_limit` replies only, read through a LATERAL
+    index scan, so a popular thread costs no more than a quiet one. Authors
+    are joined in the same query.
+    """
+    ordering = (Comment.created_at, Comment.id)
+    ranked = (
+        roots.add_columns(func.row_number().over(order_by=ordering).label("rank"))
+        .order_by(*ordering)
+        .limit(limit + 1)
+        .cte("roots")
+    )
+    tree = select(ranked.c.id, literal(0).label("depth"), ranked.c.rank).cte("tree", recursive=True)
+    child = aliased(Comment)
+    first_replies = (
+        select(child.id)
+        .where(child.parent_comment_id == tree.c.id)
+        .order_by(child.created_at, child.id)
+        .limit(replies_limit)
+        .lateral("first_replies")
+    )
+    tree = tree.union_all(
+        select(first_replies.c.id, tree.c.depth + 1, tree.c.rank)
+        .select_from(tree)
+        .join(first_replies, true())
+        .where(tree.c.depth < depth, tree.c.rank <= limit)
+    )
+    reply = aliased(Comment)
+    reply_count = select(func.count()).where(reply.parent_comment_id == Comment.id).scalar_subquery()
+    statement = (
+        select(Comment, tree.c.depth, tree.c.rank, reply_count.label("reply_count"))
+        .join(tree, tree.c.id == Comment.id)
+        .options(joinedload(Comment.user))
+        .order_by(tree.c.depth, *ordering)
+    )
+    return db.execute(statement).all()
+
+def _build_comment_threads(rows: list, limit: int) -> Tuple[List[CommentThread], Optional[str]]:
+    """Nest CTE rows (ordered by depth) into threads; comments with more replies get a replies_cursor"""
+    nodes = {}
+    roots: List[CommentThread] = []
+    next_cursor = None
+    for row in rows:
+        comment = row.Comment
+        if row.depth == 0 and row.rank > limit:
+            next_cursor = encode_cursor(COMMENT_THREAD_SORT_KEY, [roots[-1].created_at, roots[-1].id])
+            continue
+        node = CommentThread(
+            id=comment.id,
+            text=comment.text,
+            cultural_item_id=comment.cultural_item_id,
+            created_at=comment.created_at,
+            user_id=comment.user_id,
+            parent_comment_id=comment.parent_comment_id,
+            author=CommentAuthor.model_validate(comment.user) if comment.user else None,
+            depth=row.depth,
+            reply_count=row.reply_count,
+        )
+        if row.depth == 0:
+            roots.append(node)
+        else:
+            nodes[comment.parent_comment_id].replies.append(node)
+        nodes[comment.id] = node
+    for node in nodes.values():
+        if node.replies and node.reply_count > len(node.replies):
+            last = node.replies[-1]
+            node.replies_cursor = encode_cursor(COMMENT_THREAD_SORT_KEY, [last.created_at, last.id])
+    return roots, next_cursor
+
+def _after_comment_cursor(roots: Select, cursor: Optional[str]) -> Select:
+    if cursor:
+        values = decode_cursor(cursor, COMMENT_THREAD_SORT_KEY, [Comment.created_at, Comment.id])
+        roots = roots.where(tuple_(Comment.created_at, Comment.id) > tuple_(*values))
+    return roots
+
+def get_comment_threads(
+    db: Session,
+    cultural_item_id: UUID,
+    limit: int = 20,
+    depth: int = 3,
+    replies_limit: int = 10,
+    cursor: Optional[str] = None,
+) -> Tuple[List[CommentThread], Optional[str]]:
+    """A page of an item's top-level comments, each with replies down to `depth` levels"""
+    roots = select(Comment.id).where(Comment.cultural_item_id == cultural_item_id, Comment.parent_comment_id.is_(None))
+    rows = _comment_tree_rows(db, _after_comment_cursor(roots, cursor), limit, depth, replies_limit)
+    return _build_comment_threads(rows, limit)
+
+def get_comment_replies(
+    db: Session,
+    comment_id: UUID,
+    limit: int = 20,
+    depth: int = 2,
+    replies_limit: int = 10,
+    cursor: Optional[str] = None,
+) -> Tuple[List[CommentThread], Optional[str]]:
+    """A page of one comment's direct replies, each with its own replies down to `depth` levels.
+
+    Depths in the result count from these replies, not from the top of the thread.
+    """
+    roots = select(Comment.id).where(Comment.parent_comment_id == comment_id)
+    rows = _comment_tree_rows(db, _after_comment_cursor(roots, cursor), limit, depth, replies_limit)
+    return _build_comment_threads(rows, limit)
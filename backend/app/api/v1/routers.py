@@ -9,6 +9,9 @@ from app.api.v1.core.endpoints import (
 from app.api.v1.core.endpoints import user_favorites
 from app.api.v1.core.endpoints import authentication
 from app.api.v1.core.endpoints import users
+from app.api.v1.core.endpoints import events
+from app.api.v1.core.endpoints import notifications
+from app.api.v1.core.endpoints import placeholders
 
 router = APIRouter()
 
@@ -19,3 +22,6 @@ router.include_router(comments.router, prefix="/comments")
 router.include_router(blog_posts.router, prefix="/blog")  # Keep blog router
 router.include_router(authentication.router, prefix="/auth")  # Add authentication router
 router.include_router(users.router)  # Add users router without prefix (already has /users prefix)
+router.include_router(events.router, prefix="/events")
+router.include_router(notifications.router)  # Notifications router already has its prefix
+router.include_router(placeholders.router, prefix="/placeholder")
@@ -1,11 +1,23 @@
 from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi import HTTPException, status
+import asyncio
 import os
 import logging
+import time
 from contextlib import contextmanager
+from datetime import datetime, UTC
+from typing import Optional
 from dotenv import load_dotenv  # Add this import
 
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()  # Add this line
 
@@ -24,49 +36,200 @@ engine = create_engine(
     pool_recycle=3600,             # Recycle connections after an hour
     pool_size=20,                  # Increase connection pool size
     max_overflow=30,               # Allow more connections when needed
-    echo=True,                     # Log SQL queries for debugging
+    echo=settings.DB_ECHO,         # Log every SQL statement (debugging only)
     connect_args={"connect_timeout": 30}  # Increased timeout to 30 seconds
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on asyncpg for the high-traffic read routes, so a request
+# waiting on Postgres does not hold a worker thread. Same database as DB_URL.
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    pool_size=20,
+    max_overflow=30,
+    connect_args={"timeout": 30},
+)
+# Objects stay usable after commit; async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def is_db_connected():
     """Check if the database is connected and available"""
     try:
         with engine.connect() as conn:
             result = conn.execute(text("SELECT 1"))
             row = result.fetchone()
-            print(f"Database connection test result: {row}")
+            logger.debug(f"Database connection test result: {row}")
             return True
     except Exception as e:
-        logging.error(f"Database connection check failed: {str(e)}")
+        logger.error(f"Database connection check failed: {str(e)}")
         return False
 
+class DatabaseHealthMonitor:
+    """Pings the database in the background and acts as a circuit breaker.
+
+    After DB_CIRCUIT_BREAKER_THRESHOLD consecutive failed checks the circuit
+    opens and get_db fails fast with 503 instead of waiting on connection
+    timeouts. The next successful check closes it again. Only these pings
+    move the breaker: a failed query (timeout, deadlock, lock wait) says
+    nothing about whether the database is up, and a request that lost its
+    connection just asks for an early ping.
+    """
+
+    def __init__(self, interval: float, failure_threshold: int):
+        self.interval = interval
+        self.failure_threshold = failure_threshold
+        self.consecutive_failures = 0
+        self.last_checked_at: Optional[datetime] = None
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.consecutive_failures >= self.failure_threshold
+
+    def record_success(self, latency_ms: float) -> None:
+        if self.is_open:
+            logger.info("Database connection restored, closing circuit breaker")
+        self.consecutive_failures = 0
+        self.last_latency_ms = latency_ms
+        self.last_error = None
+
+    def record_failure(self, error: Exception) -> None:
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        if self.consecutive_failures == self.failure_threshold:
+            logger.error(f"Database unavailable, opening circuit breaker: {str(error)}")
+
+    def check(self) -> bool:
+        """Run a single ping and update the breaker state"""
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self.record_success((time.perf_counter() - start) * 1000)
+            return True
+        except Exception as e:
+            self.record_failure(e)
+            return False
+        finally:
+            self.last_checked_at = datetime.now(UTC)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.check)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def check_soon(self) -> None:
+        """Ping now instead of at the next interval; safe to call from any thread"""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        if self.is_open:
+            state = "down"
+        elif self.consecutive_failures:
+            state = "degraded"
+        elif self.last_checked_at is None:
+            state = "unknown"
+        else:
+            state = "up"
+        return {
+            "status": state,
+            "circuit_open": self.is_open,
+            "consecutive_failures": self.consecutive_failures,
+            "last_checked_at": self.last_checked_at.isoformat() if self.last_checked_at else None,
+            "last_latency_ms": self.last_latency_ms,
+            "last_error": self.last_error,
+        }
+
+
+db_health = DatabaseHealthMonitor(
+    interval=settings.DB_HEALTH_CHECK_INTERVAL_SECONDS,
+    failure_threshold=settings.DB_CIRCUIT_BREAKER_THRESHOLD,
+)
+
 def init_db():
     """Initialize the database with tables"""
     try:
         # Import here to avoid circular imports
         from app.api.v1.core.models import Base as ModelsBase
+        from app.api.v1.core.migrations import apply_schema_upgrades
         ModelsBase.metadata.create_all(bind=engine)
-        logging.info("Database tables created successfully")
+        apply_schema_upgrades(engine)
+        logger.info("Database tables created successfully")
     except Exception as e:
-        logging.error(f"Database initialization failed: {str(e)}")
+        logger.error(f"Database initialization failed: {str(e)}")
         raise
 
+def _connection_lost(error: Exception) -> bool:
+    return isinstance(error, DisconnectionError) or (isinstance(error, DBAPIError) and error.connection_invalidated)
+
+def _raise_if_db_unavailable():
+    if db_health.is_open:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable",
+            headers={"Retry-After": str(int(db_health.interval))},
+        )
+
 def get_db():
-    """Get database session with improved error handling"""
+    """Get database session with improved error handling.
+
+    The session only checks out a connection when the first query runs; the
+    background health monitor decides whether the database is reachable.
+    """
+    _raise_if_db_unavailable()
     db = SessionLocal()
-    connected = is_db_connected()
-    print(f"Database connected: {connected}")
     
     try:
         yield db
     except Exception as e:
-        logging.error(f"Database session error: {str(e)}")
+        if _connection_lost(e):
+            db_health.check_soon()
+        logger.error(f"Database session error: {str(e)}")
         db.rollback()
         raise
     finally:
         db.close()
 
+async def get_async_db():
+    """Get an async database session for `async def` endpoints"""
+    _raise_if_db_unavailable()
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            if _connection_lost(e):
+                db_health.check_soon()
+            logger.error(f"Database session error: {str(e)}")
+            await db.rollback()
+            raise
+
 @contextmanager
 def get_db_context():
     """Context manager version of get_db for use outside of FastAPI dependency injection"""
@@ -74,7 +237,7 @@ def get_db_context():
     try:
         yield db
     except Exception as e:
-        logging.error(f"Database session error: {str(e)}")
+        logger.error(f"Database session error: {str(e)}")
         db.rollback()
         raise
     finally:
@@ -0,0 +1,84 @@
+import csv
+import io
+import zlib
+from typing import Iterator
+
+import orjson
+from sqlalchemy import Select, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.models import CulturalItem, Tag, cultural_item_tag
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Same field names as app.ingest reads, so an export can be loaded elsewhere as is
+EXPORT_COLUMNS = (
+    "id", "title", "description", "time_period", "region", "image_url", "video_url", "audio_url",
+    "historical_significance", "is_featured", "source", "external_id", "created_at", "updated_at", "tags",
+)
+
+
+def export_statement() -> Select:
+    """Plain-column SELECT of every item with its tag names aggregated in SQL, in index order"""
+    tag_names = (
+        select(func.array_agg(aggregate_order_by(Tag.name, Tag.name)))
+        .join(cultural_item_tag, cultural_item_tag.c.tag_id == Tag.id)
+        .where(cultural_item_tag.c.cultural_item_id == CulturalItem.id)
+        .scalar_subquery()
+    )
+    columns = [getattr(CulturalItem, name) for name in EXPORT_COLUMNS[:-1]]
+    return select(*columns, tag_names.label("tags"))
+
+
+def _record(row) -> dict:
+    record = dict(row._mapping)
+    record["id"] = str(record["id"])
+    record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+    record["updated_at"] = record["updated_at"].isoformat() if record["updated_at"] else None
+    record["tags"] = record["tags"] or []
+    return record
+
+
+def stream_export(db: Session, statement: Select, fmt: str, compress: bool, chunk_rows: int = 1000) -> Iterator[bytes]:
+    """Encode the rows of `statement` as NDJSON or CSV, optionally gzipped, `chunk_rows` at a time.
+
+    Rows come from a server-side cursor (yield_per), so memory use does not
+    depend on the size of the export.
+    """
+    # wbits=31 writes a gzip container; every chunk is sync-flushed so clients see progress
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+
+    # NDJSON lines are encoded by orjson straight to bytes and joined per chunk
+    lines: list[bytes] = []
+
+    def drain() -> bytes:
+        if writer:
+            data = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        else:
+            data = b"".join(lines)
+            lines.clear()
+        if compressor:
+            data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    result = db.execute(statement.execution_options(yield_per=chunk_rows))
+    for rows in result.partitions():
+        for row in rows:
+            record = _record(row)
+            if writer:
+                record["tags"] = "|".join(record["tags"])
+                writer.writerow(record.values())
+            else:
+                lines.append(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        yield drain()
+    tail = drain()
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.db_setup import SessionLocal
+from app.api.v1.core.models import Comment, CulturalItem, User
+from app.api.v1.core.pagination import page_totals
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_MIN_UUID = "00000000-0000-0000-0000-000000000000"
+
+# One batch of a fan-out as a single statement: pick the next `batch_size`
+# recipients in user_id order, insert their notifications and add them to
+# their unread counters. Returns the last recipient, where the next batch
+# starts, and the batch size. {recipients} selects (user_id,
+# notification_type, message) for user ids after :after.
+_BATCH_SQL = """
+    WITH recipients AS (
+        SELECT user_id, notification_type, message
+        FROM ({recipients}) AS candidates
+        WHERE user_id IS DISTINCT FROM CAST(:actor_id AS uuid)
+        ORDER BY user_id
+        LIMIT :batch_size
+    ),
+    inserted AS (
+        INSERT INTO notifications (id, user_id, message, notification_type, is_read, created_at, cultural_item_id, comment_id)
+        SELECT gen_random_uuid(), user_id, message, notification_type, false, now() AT TIME ZONE 'utc',
+               CAST(:cultural_item_id AS uuid), CAST(:comment_id AS uuid)
+        FROM recipients
+        RETURNING user_id
+    ),
+    counted AS (
+        INSERT INTO notification_counters (user_id, unread_count, updated_at)
+        SELECT user_id, count(*), now() AT TIME ZONE 'utc' FROM inserted GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = notification_counters.unread_count + excluded.unread_count,
+            updated_at = excluded.updated_at
+    )
+    SELECT (SELECT user_id FROM recipients ORDER BY user_id DESC LIMIT 1), (SELECT count(*) FROM recipients)
+"""
+
+ITEM_FAVORITERS_SQL = """
+    SELECT f.user_id, CAST('item_updated' AS varchar) AS notification_type, CAST(:message AS varchar) AS message
+    FROM user_favorites f
+    WHERE f.cultural_item_id = CAST(:cultural_item_id AS uuid) AND f.user_id > CAST(:after AS uuid)
+"""
+
+# The parent comment's author gets a reply notice, everyone who favorited the
+# item a comment notice; nobody gets both
+COMMENT_RECIPIENTS_SQL = """
+    SELECT DISTINCT ON (user_id) user_id, notification_type, message
+    FROM (
+        SELECT p.user_id, CAST('reply' AS varchar) AS notification_type, CAST(:reply_message AS varchar) AS message, 0 AS priority
+        FROM comments p
+        WHERE p.id = CAST(:parent_comment_id AS uuid) AND p.user_id > CAST(:after AS uuid)
+        UNION ALL
+        SELECT f.user_id, 'comment', CAST(:message AS varchar), 1
+        FROM user_favorites f
+        WHERE f.cultural_item_id = CAST(:cultural_item_id AS uuid) AND f.user_id > CAST(:after AS uuid)
+    ) AS candidates
+    ORDER BY user_id, priority
+"""
+
+
+# Length of notifications.message
+MESSAGE_LENGTH = 255
+
+
+def _message(prefix: str, title: str, suffix: str) -> str:
+    """prefix + title + suffix, with the title shortened so the message fits its column"""
+    room = MESSAGE_LENGTH - len(prefix) - len(suffix)
+    if len(title) > room:
+        title = title[:max(room - 3, 0)] + "..."
+    return (prefix + title + suffix)[:MESSAGE_LENGTH]
+
+
+def fan_out(db: Session, recipients_sql: str, params: dict, batch_size: int) -> int:
+    """Insert notifications for every recipient in batches, committing each; returns how many"""
+    statement = text(_BATCH_SQL.format(recipients=recipients_sql))
+    params = {"actor_id": None, "cultural_item_id": None, "comment_id": None, **params, "batch_size": batch_size}
+    after = _MIN_UUID
+    total = 0
+    while True:
+        last_user_id, count = db.execute(statement, {**params, "after": after}).one()
+        db.commit()
+        total += count
+        if count < batch_size:
+            return total
+        after = str(last_user_id)
+
+
+def notify_item_updated(db: Session, cultural_item_id: UUID, actor_id: Optional[UUID] = None, batch_size: int = 5000) -> int:
+    """Tell everyone who favorited an item that it changed"""
+    title = db.scalar(select(CulturalItem.title).where(CulturalItem.id == cultural_item_id))
+    if title is None:
+        return 0
+    params = {
+        "cultural_item_id": str(cultural_item_id),
+        "actor_id": str(actor_id) if actor_id else None,
+        "message": _message('"', title, '" was updated'),
+    }
+    return fan_out(db, ITEM_FAVORITERS_SQL, params, batch_size)
+
+
+def notify_new_comment(db: Session, comment_id: UUID, batch_size: int = 5000) -> int:
+    """Tell the parent comment's author about a reply and the item's favoriters about a comment"""
+    row = db.execute(
+        select(Comment.cultural_item_id, Comment.parent_comment_id, Comment.user_id, CulturalItem.title, User.username)
+        .join(CulturalItem, CulturalItem.id == Comment.cultural_item_id)
+        .join(User, User.id == Comment.user_id)
+        .where(Comment.id == comment_id)
+    ).one_or_none()
+    if row is None:
+        return 0
+    params = {
+        "cultural_item_id": str(row.cultural_item_id),
+        "comment_id": str(comment_id),
+        "parent_comment_id": str(row.parent_comment_id) if row.parent_comment_id else None,
+        "actor_id": str(row.user_id),
+        "message": _message('New comment on "', row.title, '"'),
+        "reply_message": _message(f'{row.username} replied to your comment on "', row.title, '"'),
+    }
+    return fan_out(db, COMMENT_RECIPIENTS_SQL, params, batch_size)
+
+
+class NotificationFanout:
+    """Runs notification fan-outs on a small thread pool, off the request path.
+
+    Each job gets its own session and commits batch by batch, so a fan-out
+    to a very popular item neither holds a request open nor one long
+    transaction. Failures are logged; the triggering write has already
+    committed.
+    """
+
+    def __init__(self, max_workers: int, batch_size: int):
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notification-fanout")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.notifications_created = 0
+
+    def _run(self, fn: Callable, *args) -> int:
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                created = fn(db, *args, batch_size=self.batch_size)
+            page_totals.invalidate("notifications")
+            logger.info(
+                f"{fn.__name__} created {created} notifications in {(time.perf_counter() - started) * 1000:.0f} ms",
+                extra={"job": fn.__name__, "notifications": created},
+            )
+            with self._lock:
+                self.completed += 1
+                self.notifications_created += created
+            return created
+        except Exception as e:
+            logger.exception(f"{fn.__name__} failed: {str(e)}")
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue fn(db, *args, batch_size=...) to run in the background"""
+        with self._lock:
+            self.pending += 1
+        return self._executor.submit(self._run, fn, *args)
+
+    def shutdown(self) -> None:
+        # Let queued fan-outs finish; their triggering writes are already committed
+        self._executor.shutdown(wait=True)
+
+    def metrics(self) -> dict:
+        return {
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "notifications_created": self.notifications_created,
+        }
+
+
+notification_fanout = NotificationFanout(
+    max_workers=settings.NOTIFICATION_FANOUT_WORKERS,
+    batch_size=settings.NOTIFICATION_FANOUT_BATCH_SIZE,
+)
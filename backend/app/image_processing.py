@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from app.caching import LRUCache
+from app.settings import settings
+
+# CPU-bound Pillow work runs in worker processes so it neither blocks the
+# event loop nor competes with request threads for the GIL. Workers use the
+# spawn start method explicitly (fork is the default on Linux), so they never
+# inherit the parent's threads, locks or open DB connections, including
+# under uvicorn's reloader. A spawned worker does re-import the parent's
+# __main__ module (main.py when started with `python main.py`), which builds
+# the app objects but opens no connections until they are used.
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+async def run_in_process(fn: Callable, *args):
+    """Run a picklable top-level function in the image process pool"""
+    return await asyncio.get_running_loop().run_in_executor(get_process_pool(), fn, *args)
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def render_placeholder(width: int, height: int) -> bytes:
+    """Render a grey PNG showing its dimensions"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new("RGB", (width, height), color=(200, 200, 200))
+    draw = ImageDraw.Draw(img)
+    text = f"{width}x{height}"
+    try:
+        font = ImageFont.load_default()
+        text_width, text_height = draw.textbbox((0, 0), text, font=font)[2:4]
+        draw.text(((width - text_width) / 2, (height - text_height) / 2), text, fill=(80, 80, 80), font=font)
+    except Exception:
+        draw.text((width // 2, height // 2), text, fill=(80, 80, 80))
+
+    buffer = BytesIO()
+    # A flat image compresses to a few hundred bytes at any size
+    img.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+class PlaceholderService:
+    """Placeholder PNGs served from memory, then disk, then rendered in the process pool.
+
+    A given size always renders to the same bytes, so encoded images are
+    kept in a byte-bounded LRU, and concurrent requests for a size share one
+    render. Renders are tasks owned by the service, so a client that
+    disconnects does not cancel the render for the others. Only
+    `disk_sizes` (the pre-rendered ones) are also kept in `cache_dir`, since
+    clients choose any size up to PLACEHOLDER_MAX_DIMENSION squared.
+    """
+
+    def __init__(self, max_bytes: int, cache_dir: Optional[str] = None, disk_sizes: Iterable[Tuple[int, int]] = ()):
+        self._memory = LRUCache(max_entries=10_000, max_bytes=max_bytes)
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._disk_sizes = {tuple(size) for size in disk_sizes}
+        self._pending: Dict[Tuple[int, int], asyncio.Task] = {}
+
+    def _disk_path(self, width: int, height: int) -> Optional[Path]:
+        if self._cache_dir is None or (width, height) not in self._disk_sizes:
+            return None
+        return self._cache_dir / f"{width}x{height}.png"
+
+    def _read_disk(self, width: int, height: int) -> Optional[bytes]:
+        path = self._disk_path(width, height)
+        try:
+            return path.read_bytes() if path else None
+        except OSError:
+            return None
+
+    def _write_disk(self, width: int, height: int, data: bytes) -> None:
+        path = self._disk_path(width, height)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not write placeholder to disk cache: {str(e)}")
+
+    async def _render(self, width: int, height: int) -> bytes:
+        data = await asyncio.to_thread(self._read_disk, width, height)
+        if data is None:
+            data = await run_in_process(render_placeholder, width, height)
+            await asyncio.to_thread(self._write_disk, width, height, data)
+        self._memory.set((width, height), data, size=len(data))
+        return data
+
+    def _render_done(self, key: Tuple[int, int], task: asyncio.Task) -> None:
+        del self._pending[key]
+        # Every waiter may have gone; don't log "exception never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def get(self, width: int, height: int) -> bytes:
+        key = (width, height)
+        data = self._memory.get(key)
+        if data is not None:
+            return data
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render(width, height))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._render_done(key, done))
+        # Cancelling this request stops its wait, not the shared render
+        return await asyncio.shield(task)
+
+    async def prerender(self, sizes: Iterable[Tuple[int, int]]) -> None:
+        await asyncio.gather(*[self.get(width, height) for width, height in sizes])
+
+    def stats(self) -> dict:
+        return self._memory.stats()
+
+
+placeholder_service = PlaceholderService(
+    max_bytes=settings.PLACEHOLDER_CACHE_MAX_BYTES,
+    cache_dir=settings.PLACEHOLDER_CACHE_DIR or None,
+    disk_sizes=settings.PLACEHOLDER_PRERENDER_SIZES,
+)
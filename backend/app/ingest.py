@@ -0,0 +1,448 @@
+"""Bulk loading of cultural items from NDJSON or CSV dumps (Getty, Smithsonian, ...).
+
+Run from the backend directory:
+
+    python -m app.ingest data/ingest/getty.ndjson --batch-size 5000
+
+The file is streamed, validated and written batch by batch: missing tags are
+created with one INSERT per batch and items and their tag links are written
+with COPY, each batch in its own transaction. After every commit the number
+of records consumed is saved to a checkpoint file next to the input, so an
+interrupted load continues where it stopped when run again.
+
+NDJSON lines and CSV rows use the CulturalItem field names; "tags" is a list
+of tag names (in CSV a "|"-separated cell). Gzipped files (.gz) are read as is.
+Records whose source and external_id are already in the catalog are skipped,
+so a newer dump of the same collection can be loaded over an older one.
+"""
+import argparse
+import csv
+import gzip
+import io
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from sqlalchemy import Table, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db_setup import SessionLocal
+from app.api.v1.core.models import CulturalItem, Tag, cultural_item_tag
+from app.api.v1.core.pagination import page_totals
+from app.api.v1.core.services import adjust_source_count, random_item_sampler
+from app.response_cache import response_cache
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+ITEM_COLUMNS = (
+    "id", "title", "description", "time_period", "region", "image_url", "video_url", "audio_url",
+    "historical_significance", "is_featured", "source", "external_id", "view_count", "created_at", "updated_at",
+)
+# Items are COPYed here first so they can be inserted with ON CONFLICT; rows
+# vanish at commit, so a pooled connection can reuse the table
+STAGING_TABLE = "ingest_items"
+STAGING_DDL = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DELETE ROWS AS "
+    f"SELECT {', '.join(ITEM_COLUMNS)} FROM cultural_items WITH NO DATA"
+)
+# Records that name no source of their own
+DEFAULT_SOURCE = "import"
+TAG_LINK_COLUMNS = ("cultural_item_id", "tag_id")
+# Rejected records beyond this many per run are counted but not logged
+MAX_LOGGED_REJECTS = 20
+
+
+class IngestRecord(BaseModel):
+    """One record of a dump; lengths match the cultural_items and tags columns"""
+    title: str = Field(min_length=1, max_length=255)
+    description: Optional[str] = None
+    time_period: Optional[str] = Field(None, max_length=100)
+    region: Optional[str] = Field(None, max_length=100)
+    image_url: Optional[str] = Field(None, max_length=255)
+    video_url: Optional[str] = Field(None, max_length=255)
+    audio_url: Optional[str] = Field(None, max_length=255)
+    historical_significance: Optional[str] = None
+    is_featured: bool = False
+    source: Optional[str] = Field(None, max_length=50)
+    external_id: Optional[str] = Field(None, max_length=255)
+    tags: List[str] = []
+
+    @field_validator("external_id", mode="before")
+    @classmethod
+    def external_id_as_text(cls, value):
+        # Collections such as Getty use numeric object ids
+        return str(value) if isinstance(value, int) else value
+
+    @field_validator("source")
+    @classmethod
+    def normalize_source(cls, value: Optional[str]) -> Optional[str]:
+        return value.strip().lower() or None if value else None
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def split_tags(cls, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return value.split("|")
+        return value
+
+    @field_validator("tags")
+    @classmethod
+    def clean_tags(cls, value: List[str]) -> List[str]:
+        names = list(dict.fromkeys(name.strip() for name in value if name and name.strip()))
+        too_long = [name for name in names if len(name) > 50]
+        if too_long:
+            raise ValueError(f"tag names are limited to 50 characters: {too_long[0][:60]!r}")
+        return names
+
+
+@dataclass
+class IngestReport:
+    """Progress of one ingest; updated in place after every committed batch"""
+    path: str
+    status: str = "queued"
+    records: int = 0  # Consumed so far, including those skipped on resume and rejected
+    resumed_from: int = 0
+    inserted: int = 0
+    duplicates: int = 0  # Already loaded under the same source and external id
+    rejected: int = 0
+    tags_created: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def detect_format(path: Path) -> str:
+    suffixes = [suffix.lower() for suffix in path.suffixes if suffix.lower() != ".gz"]
+    return "csv" if suffixes and suffixes[-1] == ".csv" else "ndjson"
+
+
+def read_records(path: Path, fmt: str) -> Iterator[object]:
+    """Yield raw records one at a time: NDJSON lines unparsed, CSV rows as dicts"""
+    opener = gzip.open if path.suffix.lower() == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                # Empty cells mean "no value", not an empty string
+                yield {key: value for key, value in row.items() if value != ""}
+        else:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def validate_batch(raw_records: List[object], first_record: int) -> Tuple[List[IngestRecord], List[Tuple[int, str]]]:
+    """Validate a batch; returns the valid records and (record number, error) for the rest"""
+    valid, rejects = [], []
+    for number, raw in enumerate(raw_records, start=first_record):
+        try:
+            data = orjson.loads(raw) if isinstance(raw, str) else raw
+            valid.append(IngestRecord.model_validate(data))
+        except ValidationError as e:
+            rejects.append((number, "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())))
+        except ValueError as e:
+            rejects.append((number, f"invalid JSON: {e}"))
+    return valid, rejects
+
+
+class TagResolver:
+    """Maps tag names to ids, creating the missing ones with one statement per batch"""
+
+    def __init__(self):
+        self._ids: Dict[str, uuid.UUID] = {}
+        self.created = 0
+
+    def resolve(self, db: Session, names: Iterable[str]) -> Dict[str, uuid.UUID]:
+        missing = [name for name in dict.fromkeys(names) if name not in self._ids]
+        if missing:
+            created = db.execute(
+                pg_insert(Tag)
+                .values([{"id": uuid.uuid4(), "name": name} for name in missing])
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(Tag.name, Tag.id)
+            ).all()
+            self.created += len(created)
+            found = dict(created)
+            existing = [name for name in missing if name not in found]
+            if existing:
+                found.update(db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(existing))).all())
+            self._ids.update(found)
+        return self._ids
+
+
+def _copy(db: Session, table_name: str, columns: Tuple[str, ...], rows: List[tuple]) -> bool:
+    """COPY rows into a table; returns False when the driver has no COPY support"""
+    with db.connection().connection.dbapi_connection.cursor() as cursor:
+        if not hasattr(cursor, "copy_expert"):
+            return False
+        buffer = io.StringIO()
+        # None and "" both become an unquoted empty field, which COPY ... CSV reads as NULL
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        return True
+
+
+def copy_rows(db: Session, table: Table, columns: Tuple[str, ...], rows: List[tuple], method: str = "copy") -> None:
+    """Write rows with COPY FROM STDIN, or a multi-row INSERT when the driver has no COPY"""
+    if not rows:
+        return
+    if method == "copy" and _copy(db, table.name, columns, rows):
+        return
+    db.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+def insert_items(db: Session, rows: List[tuple], method: str = "copy") -> List[Tuple[uuid.UUID, str]]:
+    """Insert item rows, skipping (source, external_id) pairs already present; returns (id, source) of new rows"""
+    if not rows:
+        return []
+    on_conflict = "ON CONFLICT (source, external_id) DO NOTHING RETURNING id, source"
+    if method == "copy":
+        db.execute(text(STAGING_DDL))
+        if _copy(db, STAGING_TABLE, ITEM_COLUMNS, rows):
+            columns = ", ".join(ITEM_COLUMNS)
+            return db.execute(text(
+                f"INSERT INTO cultural_items ({columns}) SELECT {columns} FROM {STAGING_TABLE} {on_conflict}"
+            )).all()
+    table = CulturalItem.__table__
+    statement = (
+        pg_insert(table)
+        .values([dict(zip(ITEM_COLUMNS, row)) for row in rows])
+        .on_conflict_do_nothing(index_elements=["source", "external_id"])
+        .returning(table.c.id, table.c.source)
+    )
+    return db.execute(statement).all()
+
+
+def write_batch(
+    db: Session, records: List[IngestRecord], tags: TagResolver, method: str = "copy", source: str = DEFAULT_SOURCE
+) -> int:
+    """Insert a batch of validated records and their tag links; returns how many items were new.
+
+    Per-source item counters are adjusted in the same transaction; the caller commits.
+    """
+    tag_ids = tags.resolve(db, (name for record in records for name in record.tags))
+    now = datetime.utcnow()
+    item_rows, link_rows = [], []
+    for record in records:
+        item_id = uuid.uuid4()
+        item_rows.append((
+            item_id, record.title, record.description, record.time_period, record.region,
+            record.image_url, record.video_url, record.audio_url, record.historical_significance,
+            record.is_featured, record.source or source, record.external_id, 0, now, now,
+        ))
+        link_rows.extend((item_id, tag_ids[name]) for name in record.tags)
+    inserted = insert_items(db, item_rows, method)
+    if len(inserted) < len(item_rows):
+        new_ids = {item_id for item_id, _ in inserted}
+        link_rows = [link for link in link_rows if link[0] in new_ids]
+    copy_rows(db, cultural_item_tag, TAG_LINK_COLUMNS, link_rows, method)
+    for item_source, count in Counter(item_source for _, item_source in inserted).items():
+        adjust_source_count(db, item_source, count)
+    return len(inserted)
+
+
+def checkpoint_path_for(path: Path) -> Path:
+    return path.with_name(path.name + ".checkpoint.json")
+
+
+def load_checkpoint(checkpoint: Path, path: Path) -> int:
+    """Number of records already loaded from `path`, or 0 without a usable checkpoint"""
+    if not checkpoint.exists():
+        return 0
+    state = json.loads(checkpoint.read_text())
+    if state.get("size") != path.stat().st_size:
+        raise ValueError(f"{checkpoint} was written for a different version of {path}; delete it to start over")
+    return state["records"]
+
+
+def save_checkpoint(checkpoint: Path, path: Path, report: IngestReport) -> None:
+    # Write and rename so a crash never leaves a truncated checkpoint behind
+    state = {"size": path.stat().st_size, **report.as_dict()}
+    tmp = checkpoint.with_name(checkpoint.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, checkpoint)
+
+
+def invalidate_item_caches() -> None:
+    response_cache.invalidate("cultural_items")
+    response_cache.invalidate("tags")
+    page_totals.invalidate("cultural_items", "tags")
+    random_item_sampler.invalidate()
+
+
+def ingest_file(
+    path,
+    fmt: Optional[str] = None,
+    batch_size: int = 5000,
+    resume: bool = True,
+    method: str = "copy",
+    source: str = DEFAULT_SOURCE,
+    report: Optional[IngestReport] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> IngestReport:
+    """Stream `path` into cultural_items in committed batches of `batch_size` records.
+
+    Records without a source of their own are attributed to `source`. With
+    `resume`, records covered by the checkpoint are skipped; records already
+    loaded under the same source and external id are skipped either way.
+    `should_stop` is checked between batches; a stopped ingest can be resumed.
+    """
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    report = report or IngestReport(path=str(path))
+    checkpoint = checkpoint_path_for(path)
+    if not resume and checkpoint.exists():
+        checkpoint.unlink()
+    skip = load_checkpoint(checkpoint, path) if resume else 0
+    report.status, report.records, report.resumed_from = "running", skip, skip
+    if skip:
+        logger.info(f"Resuming {path} after {skip} records")
+
+    tags = TagResolver()
+    started = time.perf_counter()
+    records = itertools.islice(read_records(path, fmt), skip, None)
+    try:
+        with SessionLocal() as db:
+            while not should_stop():
+                raw = list(itertools.islice(records, batch_size))
+                if not raw:
+                    break
+                valid, rejects = validate_batch(raw, first_record=report.records + 1)
+                for number, error in rejects:
+                    if report.rejected < MAX_LOGGED_REJECTS:
+                        logger.warning(f"{path} record {number} rejected: {error}", extra={"record": number})
+                    report.rejected += 1
+                inserted = write_batch(db, valid, tags, method, source)
+                report.inserted += inserted
+                report.duplicates += len(valid) - inserted
+                db.commit()
+                report.records += len(raw)
+                report.tags_created = tags.created
+                report.seconds = time.perf_counter() - started
+                save_checkpoint(checkpoint, path, report)
+                logger.info(
+                    f"{path}: {report.records} records, {report.inserted} inserted, {report.duplicates} duplicates, "
+                    f"{report.rejected} rejected "
+                    f"({report.inserted / report.seconds:.0f} items/s)",
+                    extra={"ingest_id": report.id, "records": report.records, "inserted": report.inserted},
+                )
+            report.status = "stopped" if should_stop() else "completed"
+            if report.inserted:
+                # Fresh statistics for the planner and the reltuples-based page totals
+                with db.begin():
+                    db.execute(text("ANALYZE cultural_items"))
+                    db.execute(text("ANALYZE cultural_item_tag"))
+                    db.execute(text("ANALYZE tags"))
+    except Exception as e:
+        report.status, report.error = "failed", str(e)
+        raise
+    finally:
+        report.seconds = time.perf_counter() - started
+        if report.inserted:
+            invalidate_item_caches()
+    logger.info(
+        f"Ingest of {path} {report.status}: {report.inserted} items, {report.duplicates} duplicates, "
+        f"{report.tags_created} new tags, {report.rejected} rejected in {report.seconds:.1f}s",
+        extra={"ingest_id": report.id, "inserted": report.inserted, "rejected": report.rejected},
+    )
+    return report
+
+
+class IngestJobs:
+    """Runs admin-triggered ingests one at a time on a background thread.
+
+    Reports of the most recent jobs are kept for status polling. On shutdown
+    the running job stops after its current batch, so it can be resumed.
+    """
+
+    def __init__(self, batch_size: int, keep: int = 50):
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+        self._stopping = threading.Event()
+        self._jobs: Dict[str, IngestReport] = {}
+        self._keep = keep
+
+    def _run(self, report: IngestReport, fmt: Optional[str], resume: bool, source: str) -> None:
+        try:
+            ingest_file(
+                report.path, fmt=fmt, batch_size=self.batch_size, resume=resume, source=source,
+                report=report, should_stop=self._stopping.is_set,
+            )
+        except Exception as e:
+            logger.exception(f"Ingest of {report.path} failed: {str(e)}")
+
+    def submit(self, path: Path, fmt: Optional[str] = None, resume: bool = True, source: Optional[str] = None) -> IngestReport:
+        report = IngestReport(path=str(path))
+        self._jobs[report.id] = report
+        for job_id in list(self._jobs)[:-self._keep]:
+            if self._jobs[job_id].status not in ("queued", "running"):
+                del self._jobs[job_id]
+        self._executor.submit(self._run, report, fmt, resume, (source or DEFAULT_SOURCE).lower())
+        return report
+
+    def get(self, job_id: str) -> Optional[IngestReport]:
+        return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def metrics(self) -> dict:
+        statuses = [report.status for report in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "completed", "stopped", "failed")}
+
+
+ingest_jobs = IngestJobs(batch_size=settings.INGEST_BATCH_SIZE)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path, help="NDJSON or CSV file, optionally gzipped")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=settings.INGEST_BATCH_SIZE, help="records per transaction")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="source of records that do not name one, e.g. getty")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and load the whole file")
+    parser.add_argument("--insert", action="store_true", help="use multi-row INSERTs instead of COPY")
+    args = parser.parse_args()
+
+    from app.db_setup import init_db
+    from app.logging_config import configure_logging
+
+    configure_logging()
+    init_db()
+    try:
+        report = ingest_file(
+            args.path, fmt=args.format, batch_size=args.batch_size, resume=not args.restart,
+            method="insert" if args.insert else "copy", source=args.source.lower(),
+        )
+    except KeyboardInterrupt:
+        # The open batch is rolled back; the checkpoint covers everything committed
+        print("Interrupted; run again to resume from the last checkpoint")
+        raise SystemExit(130)
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.settings import settings
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+
+@dataclass
+class QueryStats:
+    """Statements executed within one request or tracking block"""
+    route: str = "-"
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+    # Only kept when asserting, to explain a failure
+    statements: Optional[List[str]] = None
+
+    def server_timing(self) -> str:
+        """Server-Timing header value for the database share of a response"""
+        return (
+            f'db;dur={self.total_seconds * 1000:.1f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.1f}"
+        )
+
+    def log_fields(self) -> dict:
+        return {
+            "route": self.route,
+            "db_queries": self.count,
+            "db_time_ms": round(self.total_seconds * 1000, 2),
+            "db_slowest_ms": round(self.slowest_seconds * 1000, 2),
+        }
+
+
+class QueryCountExceeded(AssertionError):
+    pass
+
+
+# Set per request by the instrumentation middleware. Sync endpoints run with
+# a copy of the request context and async sessions run their statements in
+# the caller's context, so both record into the same QueryStats object.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_seconds += duration
+        if duration > stats.slowest_seconds:
+            stats.slowest_seconds = duration
+            stats.slowest_statement = statement
+        if stats.statements is not None:
+            stats.statements.append(statement)
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        route = stats.route if stats is not None else "-"
+        slow_query_logger.warning(
+            f"Slow query ({duration * 1000:.1f} ms) in {route}: {statement}",
+            extra={"route": route, "duration_ms": round(duration * 1000, 2), "statement": statement},
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for failed statements
+    started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def route_template(method: str, scope: dict) -> str:
+    """Label a request by the template of the route that served it, e.g. GET /api/v1/events/{event_id}.
+
+    FastAPI puts the route of the included router in the scope, whose template
+    lacks the prefixes it was included under; those are the literal part of the
+    path in front of what the route matched. Requests that matched no route
+    share one label, so clients cannot add labels.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return f"{method} (unmatched)"
+    path = scope["path"]
+    start = 0
+    while start != -1:
+        if route.path_regex.match(path[start:]):
+            return f"{method} {path[:start]}{template}"
+        start = path.find("/", start + 1)
+    return f"{method} {template}"
+
+
+@contextmanager
+def track_queries(route: str = "-", keep_statements: bool = False):
+    """Record the statements executed by every engine inside the block"""
+    stats = QueryStats(route=route, statements=[] if keep_statements else None)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def check_query_count(stats: QueryStats, limit: int) -> None:
+    if stats.count > limit:
+        statements = "\n".join(f"  {i + 1}. {statement}" for i, statement in enumerate(stats.statements or []))
+        raise QueryCountExceeded(f"{stats.route} ran {stats.count} queries, expected at most {limit}:\n{statements}")
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail with QueryCountExceeded if the block runs more than `limit` statements.
+
+        with assert_max_queries(2):
+            get_cultural_items_page(db, limit=100)
+
+    Requests made through a test client run in another thread; cover those
+    with QUERY_COUNT_ASSERT_LIMIT instead.
+    """
+    with track_queries("block", keep_statements=True) as stats:
+        yield stats
+    check_query_count(stats, limit)
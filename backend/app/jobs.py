@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from app.db_setup import SessionLocal, db_health
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Run a database maintenance function every `interval` seconds in a worker thread.
+
+    `fn` receives a fresh Session. Runs are skipped while the database
+    circuit breaker is open, and a failing run is logged without stopping
+    the schedule.
+    """
+
+    def __init__(self, name: str, fn: Callable, interval: float, run_at_start: bool = True):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.run_at_start = run_at_start
+        self.last_result = None
+        self._task: Optional[asyncio.Task] = None
+
+    def run_once(self):
+        with SessionLocal() as db:
+            self.last_result = self.fn(db)
+        return self.last_result
+
+    async def _run(self) -> None:
+        if not self.run_at_start:
+            await asyncio.sleep(self.interval)
+        while True:
+            if not db_health.is_open:
+                try:
+                    result = await asyncio.to_thread(self.run_once)
+                    logger.info(f"Job {self.name} finished: {result}", extra={"job": self.name, "result": result})
+                except Exception as e:
+                    logger.exception(f"Job {self.name} failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,90 @@
+"""Server-side Markdown rendering of blog posts.
+
+Posts are rendered once when they are written and the HTML is stored with a
+hash of the content and the renderer version. After changing the renderer,
+bump RENDERER_VERSION and re-render every stale post from the backend
+directory:
+
+    python -m app.rendering
+"""
+import argparse
+import hashlib
+import logging
+
+from markdown_it import MarkdownIt
+from sqlalchemy import select
+from sqlalchemy.orm import Session, load_only
+
+from app.api.v1.core.models import BlogPost
+
+logger = logging.getLogger(__name__)
+
+# Part of every content hash, so bumping it marks all stored HTML as stale
+RENDERER_VERSION = 1
+
+# CommonMark with raw HTML disabled: tags in posts are escaped, and links with
+# javascript:/vbscript:/data: URLs are left as text by markdown-it's link validation
+_markdown = MarkdownIt("commonmark", {"html": False}).enable(["table", "strikethrough"])
+
+
+def render_markdown(content: str) -> str:
+    return _markdown.render(content or "")
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(f"{RENDERER_VERSION}\0{content or ''}".encode("utf-8")).hexdigest()
+
+
+def render_post(post: BlogPost) -> bool:
+    """Store the HTML of a post's content unless it is current; returns whether it was rendered"""
+    expected = content_hash(post.content)
+    if post.content_hash == expected and post.content_html is not None:
+        return False
+    post.content_html = render_markdown(post.content)
+    post.content_hash = expected
+    return True
+
+
+def rerender_posts(db: Session, force: bool = False, batch_size: int = 200) -> int:
+    """Re-render stale posts (or all with `force`), committing per batch; returns how many were rendered"""
+    rendered = 0
+    last_id = None
+    while True:
+        statement = (
+            select(BlogPost)
+            .options(load_only(BlogPost.content, BlogPost.content_html, BlogPost.content_hash))
+            .order_by(BlogPost.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            statement = statement.where(BlogPost.id > last_id)
+        posts = db.execute(statement).scalars().all()
+        if not posts:
+            return rendered
+        for post in posts:
+            if force:
+                post.content_hash = None
+            rendered += render_post(post)
+        # Read before committing, which expires the instances
+        last_id = posts[-1].id
+        db.commit()
+        logger.info(f"Re-rendered {rendered} blog posts so far", extra={"rendered": rendered})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="re-render every post, not only stale ones")
+    args = parser.parse_args()
+
+    from app.db_setup import SessionLocal, init_db
+    from app.logging_config import configure_logging
+
+    configure_logging()
+    init_db()
+    with SessionLocal() as db:
+        rendered = rerender_posts(db, force=args.all)
+    print(f"Rendered {rendered} blog posts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.caching import LRUCache
+from app.settings import settings
+
+# Headers that are recomputed for every response served from the cache
+_SKIPPED_HEADERS = {"content-length", "etag", "cache-control"}
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    tags: FrozenSet[str]
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: Dict[str, str]
+    etag: str
+    tags: FrozenSet[str]
+
+
+def cache_response(ttl: float, tags: Iterable[str] = ()) -> Callable:
+    """Cache successful GET responses of an endpoint for `ttl` seconds.
+
+    Only takes effect on routers created with `route_class=CachedRoute`.
+    Entries are dropped early by `response_cache.invalidate(tag)` for any of
+    the given tags, so every write path touching the data must invalidate it.
+    """
+    policy = CachePolicy(ttl=ttl, tags=frozenset(tags))
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__cache_policy__ = policy
+        return endpoint
+
+    return decorator
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return etag in candidates
+
+
+class ResponseCache:
+    """Rendered responses of read-mostly routes, keyed on path and normalized query.
+
+    Entries are bounded both by count and by total body size and carry a
+    strong ETag, so clients can revalidate with If-None-Match and get a 304
+    without the route touching the database.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._entries = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, so a response rendered from data read
+        # before a write is not stored after that write invalidated the cache
+        self._generation = 0
+
+    @staticmethod
+    def make_key(request: Request) -> Tuple:
+        query = tuple(sorted((key, value) for key, value in request.query_params.multi_items() if value != ""))
+        return request.url.path.rstrip("/"), query
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    def store(self, key: Tuple, response: Response, policy: CachePolicy, generation: int) -> CachedResponse:
+        body = bytes(response.body)
+        entry = CachedResponse(
+            body=body,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS},
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            tags=policy.tags,
+        )
+        with self._lock:
+            if generation == self._generation:
+                self._entries.set(key, entry, ttl=policy.ttl, size=len(body))
+        return entry
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every cached response carrying any of the tags"""
+        tags = frozenset(tags)
+        with self._lock:
+            self._generation += 1
+            return self._entries.discard_where(lambda _, entry: not entry.tags.isdisjoint(tags))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return self._entries.stats()
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
+
+
+def _render(entry: CachedResponse, request: Request, cache_status: str) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": cache_status}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, status_code=200, headers={**entry.headers, **headers})
+
+
+class CachedRoute(APIRoute):
+    """APIRoute that serves endpoints marked with @cache_response from response_cache"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        policy: Optional[CachePolicy] = getattr(self.endpoint, "__cache_policy__", None)
+        if policy is None:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+            key = response_cache.make_key(request)
+            entry = response_cache.get(key)
+            if entry is not None:
+                return _render(entry, request, "HIT")
+            generation = response_cache.generation
+            response = await handler(request)
+            if response.status_code != 200 or not hasattr(response, "body"):
+                return response
+            entry = response_cache.store(key, response, policy, generation)
+            return _render(entry, request, "MISS")
+
+        return cached_handler
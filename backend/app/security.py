@@ -1,17 +1,24 @@
+import asyncio
 import base64
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from random import SystemRandom
-from typing import Annotated, Optional
+from typing import Annotated, Any, Callable, Optional, Tuple
 from uuid import UUID
 
 from app.api.v1.core.models import Token, User
+from app.caching import LRUCache
 from app.db_setup import get_db
 from app.settings import settings
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select, update
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 
 # Fix tokenUrl to match actual API structure - include the full path that matches the frontend
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
@@ -21,12 +28,110 @@ DEFAULT_ENTROPY = 32
 _sysrand = SystemRandom()
 
 
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded thread pool.
+
+    At most `max_workers` hashes run at once and `max_queue` more may wait for
+    a worker; beyond that callers get a 503 instead of piling up. bcrypt
+    releases the GIL, so the workers hash in parallel without holding up the
+    event loop or the request threads of unrelated endpoints.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations, please retry",
+                headers={"Retry-After": "1"},
+            )
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+
+        def run():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                with self._lock:
+                    self.in_flight -= 1
+                    self.completed += 1
+                    self.total_wait_seconds += started_at - submitted_at
+                    self.total_hash_seconds += finished_at - started_at
+                    self.max_hash_seconds = max(self.max_hash_seconds, finished_at - started_at)
+                self._slots.release()
+
+        return self._executor.submit(run)
+
+    def run(self, fn: Callable, *args) -> Any:
+        """Run fn on the pool and wait for the result (for sync call sites)"""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args) -> Any:
+        """Run fn on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.max_workers,
+                "queue_size": self.max_queue,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.max_workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_hash_ms": round(self.total_hash_seconds / completed * 1000, 2),
+                "max_hash_ms": round(self.max_hash_seconds * 1000, 2),
+                "avg_queue_wait_ms": round(self.total_wait_seconds / completed * 1000, 2),
+            }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.run(pwd_context.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one is deprecated"""
+    return password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run_async(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run_async(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.run_async(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def token_bytes(nbytes=None) -> bytes:
@@ -40,6 +145,114 @@ def token_urlsafe(nbytes=None) -> str:
     return base64.urlsafe_b64encode(tok).rstrip(b"=").decode("ascii")
 
 
+@dataclass
+class CachedToken:
+    """Detached snapshot of a verified token and its user"""
+    token: Token
+    user: User
+    expires_at: datetime
+    extended_at: float = 0.0  # time.monotonic() of the last sliding-expiry write
+
+
+class TokenCache:
+    """Verified bearer tokens, so authenticated requests can skip the tokens lookup.
+
+    Entries are dropped whenever a token is revoked or its user changes, after
+    the change is committed. Every invalidation bumps a generation, and a
+    verification only stores its result if no invalidation happened since it
+    started, so a token revoked meanwhile cannot be cached again.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._entries = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, token_str: str) -> Optional["CachedToken"]:
+        return self._entries.get(token_str)
+
+    def store(self, token_str: str, entry: "CachedToken", generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._entries.set(token_str, entry)
+
+    def invalidate_token(self, token_str: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(token_str)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.discard_where(lambda _, entry: entry.user.id == user_id)
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+token_cache = TokenCache(
+    max_entries=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+_expiry_lock = threading.Lock()
+
+
+def invalidate_cached_token(token_str: str) -> None:
+    token_cache.invalidate_token(token_str)
+
+
+def invalidate_cached_user(user_id: UUID) -> None:
+    """Drop every cached token of a user; call after committing the revocation or user change"""
+    token_cache.invalidate_user(user_id)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Token.expires_at is stored without a timezone, in UTC
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def _snapshot(instance):
+    """Copy the loaded columns of an instance into a clean, detached instance"""
+    mapper = inspect(instance).mapper
+    copy = mapper.class_(**{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _attach(db: Session, entry: CachedToken) -> Token:
+    """Attach a cached snapshot to the session without querying the database"""
+    token = db.merge(entry.token, load=False)
+    user = db.merge(entry.user, load=False)
+    set_committed_value(token, "user", user)
+    return token
+
+
+def _extend_expiry_if_needed(db: Session, entry: CachedToken) -> None:
+    """Slide the expiry of a token that is about to expire.
+
+    The row is written at most once per TOKEN_EXPIRY_EXTEND_INTERVAL_SECONDS,
+    however many requests arrive with the token in the meantime.
+    """
+    lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    now = datetime.now(UTC)
+    # If token will expire in less than 10% of its original lifetime, extend it
+    if entry.expires_at - now >= lifetime * 0.1:
+        return
+    with _expiry_lock:
+        if time.monotonic() - entry.extended_at < settings.TOKEN_EXPIRY_EXTEND_INTERVAL_SECONDS:
+            return
+        entry.extended_at = time.monotonic()
+    
+    new_expiry = now + lifetime
+    db.execute(update(Token).where(Token.id == entry.token.id).values(expires_at=new_expiry))
+    db.commit()
+    entry.expires_at = new_expiry
+
+
 def create_database_token(user_id: UUID, db: Session) -> Token:
     randomized_token = token_urlsafe(64)  # Increased length for better security
     expires_at = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -53,9 +266,11 @@ def create_database_token(user_id: UUID, db: Session) -> Token:
         token.is_revoked = True
     
     # Create new token
-    new_token = Token(token=randomized_token, user_id=user_id, expires_at=expires_at)
+    # The column has no timezone; asyncpg refuses aware datetimes for it
+    new_token = Token(token=randomized_token, user_id=user_id, expires_at=expires_at.replace(tzinfo=None))
     db.add(new_token)
     db.commit()
+    invalidate_cached_user(user_id)
     db.refresh(new_token)
     
     # Ensure the user relationship is loaded
@@ -66,9 +281,20 @@ def create_database_token(user_id: UUID, db: Session) -> Token:
 
 def verify_token_access(token_str: str, db: Session) -> Token:
     try:
+        entry = token_cache.get(token_str)
+        if entry is not None and entry.expires_at > datetime.now(UTC):
+            token = _attach(db, entry)
+            _extend_expiry_if_needed(db, entry)
+            return token
+        
+        # Taken before reading, so a revocation committed meanwhile wins
+        generation = token_cache.generation
+        # Load the token and its user in a single round trip
         token = (
             db.execute(
-                select(Token).where(
+                select(Token)
+                .options(joinedload(Token.user))
+                .where(
                     Token.token == token_str,
                     Token.expires_at > datetime.now(UTC),
                     Token.is_revoked == False,
@@ -79,28 +305,29 @@ def verify_token_access(token_str: str, db: Session) -> Token:
         )
         
         if not token:
+            invalidate_cached_token(token_str)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token invalid or expired",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Ensure the user relationship is loaded
-        db.refresh(token, attribute_names=['user'])
-        
         if not token.user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-            
+        
+        entry = CachedToken(
+            token=_snapshot(token),
+            user=_snapshot(token.user),
+            expires_at=_as_utc(token.expires_at),
+        )
+        token_cache.store(token_str, entry, generation)
+        
         # Check if token is about to expire and extend it if needed
-        time_until_expiry = token.expires_at - datetime.now(UTC)
-        # If token will expire in less than 10% of its original lifetime, extend it
-        if time_until_expiry < timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 0.1):
-            token.expires_at = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-            db.commit()
+        _extend_expiry_if_needed(db, entry)
             
         return token
     except HTTPException:
@@ -170,6 +397,7 @@ def revoke_token(token: Annotated[str, Depends(oauth2_scheme)], db: Session) ->
     if db_token:
         db_token.is_revoked = True
         db.commit()
+    invalidate_cached_token(token)
 
 
 def get_current_token(
@@ -0,0 +1,23 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def json_dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, the same bytes Starlette's JSONResponse writes for JSON-native data"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, for routes that return plain dicts and lists.
+
+    Routes with a response_model must keep FastAPI's default response class:
+    only then does FastAPI validate with the route's cached TypeAdapter and
+    write JSON directly in pydantic-core, which any custom class (including
+    an app-wide one) turns back into a Python dict plus a second encoding
+    pass. See benchmarks/serialization.py.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
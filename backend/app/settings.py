@@ -1,3 +1,5 @@
+from typing import Dict, List, Tuple
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,6 +20,73 @@ class Settings(BaseSettings):
     # Add Smithsonian API key field
     SMITHSONIAN_API_KEY: str = ""  # Default to empty string
 
+    # Bearer token verification cache
+    TOKEN_CACHE_TTL_SECONDS: int = 60  # How long a verified token is trusted without hitting the database
+    TOKEN_CACHE_MAX_SIZE: int = 10000  # Maximum number of cached tokens
+    TOKEN_EXPIRY_EXTEND_INTERVAL_SECONDS: int = 300  # Sliding expiry is written at most once per interval
+
+    # Background database health monitor and circuit breaker
+    DB_HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    DB_CIRCUIT_BREAKER_THRESHOLD: int = 3  # Consecutive failed checks before requests fail fast with 503
+
+    # Dedicated bcrypt worker pool
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64  # Hash requests allowed to wait for a worker before returning 503
+
+    # Rendered responses of read-mostly catalog routes
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Image processing and placeholder images
+    IMAGE_PROCESS_WORKERS: int = 2
+    PLACEHOLDER_MAX_DIMENSION: int = 2000  # Larger placeholder requests are rejected
+    PLACEHOLDER_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    PLACEHOLDER_CACHE_DIR: str = ""  # Also keep the pre-rendered sizes on disk when set
+    PLACEHOLDER_PRERENDER_SIZES: List[Tuple[int, int]] = [(150, 150), (300, 200), (400, 300), (600, 400), (800, 600)]
+
+    # Profile image uploads
+    PROFILE_IMAGE_MAX_BYTES: int = 5 * 1024 * 1024
+    PROFILE_IMAGE_VARIANT_SIZES: List[int] = [64, 256]  # Square avatar sizes in pixels
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+
+    # Totals of paginated lists
+    PAGINATION_EXACT_TOTAL_MAX_ROWS: int = 50_000  # Tables estimated at most this large are counted in the page query
+    PAGINATION_TOTAL_CACHE_SECONDS: float = 60.0  # Reuse of COUNTs on larger tables; writes invalidate earlier
+
+    # Repair drifted unread notification counters this often (0 disables)
+    NOTIFICATION_COUNTER_RECONCILE_SECONDS: float = 3600.0
+    # Background notification fan-out to favoriters and comment authors
+    NOTIFICATION_FANOUT_WORKERS: int = 2
+    NOTIFICATION_FANOUT_BATCH_SIZE: int = 5000  # Recipients per INSERT ... SELECT and commit
+
+    # Repair drifted per-source item and per-category blog post counters this often (0 disables)
+    SOURCE_COUNT_RECONCILE_SECONDS: float = 3600.0
+    BLOG_CATEGORY_COUNT_RECONCILE_SECONDS: float = 3600.0
+
+    # Bulk item ingest (python -m app.ingest and POST /cultural-items/ingest)
+    INGEST_DIR: str = "data/ingest"  # The admin endpoint only reads files below this directory
+    INGEST_BATCH_SIZE: int = 5000  # Records per validated batch and transaction
+
+    # In-memory id pools behind /cultural-items/random
+    RANDOM_SAMPLE_REFRESH_SECONDS: float = 300.0
+    RANDOM_SAMPLE_POOL_MAX: int = 100_000  # Larger catalogs are pooled as a random subset of this size
+    RANDOM_SAMPLE_MAX_IDS: int = 400_000  # Across all pools
+    # Regions with their own pools (lower case); draws for other regions read a TABLESAMPLE
+    RANDOM_SAMPLE_REGIONS: List[str] = []
+    RANDOM_SAMPLE_TABLESAMPLE_PERCENT: float = 1.0  # Share of table pages read by such a draw
+
+    # Test/debug mode: fail any request that runs more queries than this (0 disables)
+    QUERY_COUNT_ASSERT_LIMIT: int = 0
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # Statements at least this slow are logged with their route
+    DB_ECHO: bool = False  # Log every SQL statement; far too verbose outside local debugging
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped rather than blocking requests
+    LOG_SAMPLE_RATES: Dict[str, float] = {"DEBUG": 0.01}  # Fraction of requests whose lines at a level are kept
+    LOG_LEVELS: Dict[str, str] = {}  # Per-logger overrides, e.g. {"app.requests": "WARNING"}
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
@@ -0,0 +1,122 @@
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from app.image_processing import run_in_process
+from app.settings import settings
+
+# Uploaded profile images and their resized variants, served under /static
+UPLOAD_DIR = Path("static/profile_images")
+UPLOAD_URL_PREFIX = "/static/profile_images"
+
+# Leading bytes of the accepted image formats -> file extension
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+
+
+def detect_image_type(head: bytes) -> Optional[str]:
+    """Return the file extension for the image format in `head`, judged by magic bytes"""
+    for signature, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def make_image_variants(source: str, directory: str, stem: str, sizes: List[int]) -> Dict[str, Dict[str, str]]:
+    """Write square WebP and JPEG variants of an image; runs in the image process pool.
+
+    Returns {size: {"webp": filename, "jpeg": filename}}. Raises if the file
+    is not a decodable image.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+        variants = {}
+        for size in sizes:
+            resized = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+            webp_name = f"{stem}_{size}.webp"
+            jpeg_name = f"{stem}_{size}.jpg"
+            resized.save(os.path.join(directory, webp_name), format="WEBP", quality=80, method=4)
+            resized.save(os.path.join(directory, jpeg_name), format="JPEG", quality=85, optimize=True, progressive=True)
+            variants[str(size)] = {"webp": webp_name, "jpeg": jpeg_name}
+    return variants
+
+
+async def _write_upload(upload: UploadFile, path: Path) -> str:
+    """Stream an upload to `path` in chunks, enforcing the size cap and the magic bytes"""
+    max_bytes = settings.PROFILE_IMAGE_MAX_BYTES
+    written = 0
+    extension = None
+    handle = await run_in_threadpool(open, path, "wb")
+    try:
+        while chunk := await upload.read(settings.UPLOAD_CHUNK_SIZE):
+            if extension is None:
+                extension = detect_image_type(chunk)
+                if extension is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Only image files (JPEG, PNG, GIF, WebP) are allowed",
+                    )
+            written += len(chunk)
+            if written > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Profile image must be at most {max_bytes // (1024 * 1024)} MB",
+                )
+            await run_in_threadpool(handle.write, chunk)
+    finally:
+        await run_in_threadpool(handle.close)
+    if extension is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Profile image is empty")
+    return extension
+
+
+async def save_profile_image(upload: UploadFile, user_id: uuid.UUID) -> Tuple[str, Dict[str, Dict[str, str]]]:
+    """Store an uploaded profile image and its resized variants.
+
+    Returns the URL of the original and {size: {"webp": url, "jpeg": url}}.
+    Invalid uploads raise 400 (not an image) or 413 (too large) and leave
+    nothing behind.
+    """
+    await run_in_threadpool(UPLOAD_DIR.mkdir, parents=True, exist_ok=True)
+    # Never reuse the client filename: it is untrusted and may contain path separators
+    stem = f"{user_id}_{uuid.uuid4().hex[:12]}"
+    partial_path = UPLOAD_DIR / f"{stem}.part"
+    created: List[Path] = [partial_path]
+    try:
+        extension = await _write_upload(upload, partial_path)
+        original_path = UPLOAD_DIR / f"{stem}.{extension}"
+        await run_in_threadpool(os.replace, partial_path, original_path)
+        created.append(original_path)
+        try:
+            variants = await run_in_process(
+                make_image_variants, str(original_path), str(UPLOAD_DIR), stem, settings.PROFILE_IMAGE_VARIANT_SIZES
+            )
+        except Exception as e:
+            logging.warning(f"Could not decode uploaded profile image: {str(e)}")
+            created.extend(UPLOAD_DIR.glob(f"{stem}_*"))
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Profile image could not be decoded")
+    except BaseException:
+        for path in created:
+            await run_in_threadpool(path.unlink, missing_ok=True)
+        raise
+
+    image_url = f"{UPLOAD_URL_PREFIX}/{original_path.name}"
+    variant_urls = {
+        size: {fmt: f"{UPLOAD_URL_PREFIX}/{name}" for fmt, name in formats.items()}
+        for size, formats in variants.items()
+    }
+    return image_url, variant_urls
@@ -0,0 +1,104 @@
+"""Compare sync and async request throughput for the cultural item list under high concurrency.
+
+Run from the backend directory against a scratch database:
+
+    python -m benchmarks.async_throughput --concurrency 1000 --requests 5000
+
+The same page query is served by two minimal in-process apps: one through a
+sync `def` endpoint on get_db (one worker thread per in-flight request) and
+one through an `async def` endpoint on get_async_db. Requests go through
+httpx's ASGI transport, so only the framework and database layers are
+measured, not the network.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db_setup import async_engine, engine, get_async_db, get_db, init_db
+from app.api.v1.core.schemas import CulturalItem
+from app.api.v1.core.services import get_cultural_items_page, get_cultural_items_page_async
+
+
+def build_apps(limit: int) -> dict:
+    sync_app = FastAPI()
+    async_app = FastAPI()
+
+    @sync_app.get("/items", response_model=list[CulturalItem])
+    def sync_items(db: Session = Depends(get_db)):
+        items, _ = get_cultural_items_page(db, limit=limit)
+        return items
+
+    @async_app.get("/items", response_model=list[CulturalItem])
+    async def async_items(db: AsyncSession = Depends(get_async_db)):
+        items, _, _ = await get_cultural_items_page_async(db, limit=limit)
+        return items
+
+    return {"sync": sync_app, "async": async_app}
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> dict:
+    # Server errors (e.g. connection pool timeouts) are counted, not raised
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one_request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/items")
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        # Warm up both connection pools before timing
+        await asyncio.gather(*[one_request() for _ in range(min(concurrency, 50))])
+        latencies.clear()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one_request() for _ in range(total)])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "errors": errors,
+    }
+
+
+async def main_async(args) -> None:
+    apps = build_apps(args.limit)
+    print(f"{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    try:
+        for mode in args.modes.split(","):
+            result = await run(apps[mode], args.requests, args.concurrency)
+            print(f"{mode:<6} {result['rps']:>9.1f} {result['p50']:>9.1f} {result['p99']:>9.1f} {result['errors']:>7}")
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=1000, help="concurrent in-flight requests")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per mode")
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--modes", default="sync,async", help="comma separated modes to run (sync, async)")
+    args = parser.parse_args()
+
+    engine.echo = False
+    init_db()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Compare per-row ORM notification inserts against the set-based fan-out.
+
+Run from the backend directory against a scratch database:
+
+    python -m benchmarks.notification_fanout --recipients 100000
+
+Synthetic users whose username starts with "bench_" favorite one synthetic
+item. Every one of them is notified that the item changed, first with one
+ORM add() per recipient (on a sample, since it is slow) and then with
+notify_item_updated. Everything is removed again at the end unless --keep
+is given.
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.db_setup import SessionLocal, engine, init_db
+from app.api.v1.core.models import Notification
+from app.api.v1.core.services import adjust_unread_count
+from app.fanout import notify_item_updated
+
+BENCH_PREFIX = "bench_"
+BENCH_ITEM_TITLE = "[bench] fan-out item"
+
+SEED_USERS_SQL = text("""
+    INSERT INTO users (id, email, username, hashed_password, is_active, is_admin, created_at)
+    SELECT gen_random_uuid(), :prefix || g || '@example.com', :prefix || g, 'x', true, false, now()
+    FROM generate_series(:start, :stop) AS g
+""")
+
+SEED_FAVORITES_SQL = text("""
+    INSERT INTO user_favorites (id, user_id, cultural_item_id, created_at)
+    SELECT gen_random_uuid(), u.id, CAST(:item_id AS uuid), now()
+    FROM users u
+    WHERE u.username LIKE :pattern
+      AND NOT EXISTS (SELECT 1 FROM user_favorites f WHERE f.user_id = u.id AND f.cultural_item_id = CAST(:item_id AS uuid))
+""")
+
+
+def seed(recipients: int) -> str:
+    with engine.begin() as conn:
+        item_id = conn.execute(text("SELECT id FROM cultural_items WHERE title = :title"), {"title": BENCH_ITEM_TITLE}).scalar()
+        if item_id is None:
+            item_id = conn.execute(text("""
+                INSERT INTO cultural_items (id, title, is_featured, view_count, created_at, updated_at)
+                VALUES (gen_random_uuid(), :title, false, 0, now(), now()) RETURNING id
+            """), {"title": BENCH_ITEM_TITLE}).scalar()
+        existing = conn.execute(text("SELECT count(*) FROM users WHERE username LIKE :pattern"), {"pattern": f"{BENCH_PREFIX}%"}).scalar()
+        if recipients > existing:
+            print(f"Seeding {recipients - existing} synthetic users...")
+            conn.execute(SEED_USERS_SQL, {"prefix": BENCH_PREFIX, "start": existing + 1, "stop": recipients})
+        conn.execute(SEED_FAVORITES_SQL, {"item_id": str(item_id), "pattern": f"{BENCH_PREFIX}%"})
+        conn.execute(text("ANALYZE users"))
+        conn.execute(text("ANALYZE user_favorites"))
+    return str(item_id)
+
+
+def clear_notifications(item_id: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM notifications WHERE cultural_item_id = CAST(:item_id AS uuid)"), {"item_id": item_id})
+        conn.execute(text("""
+            DELETE FROM notification_counters c USING users u
+            WHERE c.user_id = u.id AND u.username LIKE :pattern
+        """), {"pattern": f"{BENCH_PREFIX}%"})
+
+
+def cleanup(item_id: str) -> None:
+    clear_notifications(item_id)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM user_favorites WHERE cultural_item_id = CAST(:item_id AS uuid)"), {"item_id": item_id})
+        conn.execute(text("DELETE FROM users WHERE username LIKE :pattern"), {"pattern": f"{BENCH_PREFIX}%"})
+        conn.execute(text("DELETE FROM cultural_items WHERE id = CAST(:item_id AS uuid)"), {"item_id": item_id})
+
+
+def orm_fan_out(item_id: str, sample: int) -> int:
+    """What fan-out would look like written naively: one add() and counter upsert per recipient"""
+    with SessionLocal() as db:
+        user_ids = db.execute(
+            text("SELECT user_id FROM user_favorites WHERE cultural_item_id = CAST(:item_id AS uuid) LIMIT :sample"),
+            {"item_id": item_id, "sample": sample},
+        ).scalars().all()
+        for user_id in user_ids:
+            db.add(Notification(user_id=user_id, message="updated", notification_type="item_updated", cultural_item_id=item_id))
+            adjust_unread_count(db, user_id, 1)
+        db.commit()
+    return len(user_ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, default=100_000, help="number of users who favorited the item")
+    parser.add_argument("--orm-sample", type=int, default=5_000, help="recipients notified by the per-row baseline")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="recipients per set-based batch")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic users and item afterwards")
+    args = parser.parse_args()
+
+    init_db()
+    item_id = seed(args.recipients)
+    try:
+        clear_notifications(item_id)
+        start = time.perf_counter()
+        orm_count = orm_fan_out(item_id, args.orm_sample)
+        orm_seconds = time.perf_counter() - start
+        clear_notifications(item_id)
+
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            set_count = notify_item_updated(db, item_id, batch_size=args.batch_size)
+        set_seconds = time.perf_counter() - start
+
+        orm_rate = orm_count / orm_seconds
+        set_rate = set_count / set_seconds
+        print(f"{'method':<24} {'recipients':>10} {'seconds':>9} {'rows/s':>10}")
+        print(f"{'per-row ORM add()':<24} {orm_count:>10} {orm_seconds:>9.2f} {orm_rate:>10.0f}")
+        print(f"{'INSERT ... SELECT':<24} {set_count:>10} {set_seconds:>9.2f} {set_rate:>10.0f}")
+        print(f"Per-row would take ~{args.recipients / orm_rate:.1f}s for all {args.recipients} recipients "
+              f"({set_rate / orm_rate:.0f}x slower)")
+    finally:
+        if args.keep:
+            clear_notifications(item_id)
+        else:
+            cleanup(item_id)
+
+
+if __name__ == "__main__":
+    main()
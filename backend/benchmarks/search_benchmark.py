@@ -0,0 +1,117 @@
+"""Compare full-text search against the legacy ILIKE search on a large catalog.
+
+Run from the backend directory against a scratch database:
+
+    python -m benchmarks.search_benchmark --items 1000000
+
+Synthetic items are inserted with a "[bench]" title prefix and removed again
+at the end unless --keep is given, so repeated runs can reuse them.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func, or_, select, text
+
+from app.db_setup import SessionLocal, engine, init_db
+from app.api.v1.core.models import CulturalItem
+from app.api.v1.core.search import search_condition, search_statement
+
+BENCH_PREFIX = "[bench]"
+
+SEED_SQL = text("""
+    INSERT INTO cultural_items (
+        id, title, description, region, time_period, historical_significance,
+        is_featured, view_count, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(),
+        :prefix || ' ' || (ARRAY['Bronze', 'Jade', 'Ceramic', 'Silver', 'Stone', 'Gold', 'Ivory', 'Wooden'])[1 + g % 8]
+            || ' ' || (ARRAY['amphora', 'mirror', 'mask', 'necklace', 'manuscript', 'bowl', 'statue', 'helmet', 'coin', 'textile'])[1 + (g / 8) % 10]
+            || ' #' || g,
+        'A ' || (ARRAY['ceremonial', 'funerary', 'domestic', 'royal', 'votive'])[1 + g % 5]
+            || ' object decorated with ' || (ARRAY['geometric', 'floral', 'animal', 'mythological', 'calligraphic'])[1 + (g / 5) % 5]
+            || ' motifs, recovered during excavation season ' || (g % 97),
+        (ARRAY['Greece', 'Egypt', 'Mesoamerica', 'Scandinavia', 'Persia', 'China', 'Rome', 'British Isles'])[1 + (g / 3) % 8],
+        (ARRAY['Classical Period', 'New Kingdom', 'Late Classic Period', 'Viking Age', 'Tang Dynasty', 'Iron Age'])[1 + (g / 7) % 6],
+        'Illustrates trade and craftsmanship networks of its era.',
+        g % 50 = 0,
+        0,
+        now() - (g || ' minutes')::interval,
+        now()
+    FROM generate_series(1, :count) AS g
+""")
+
+
+def seed(target: int) -> None:
+    with engine.begin() as conn:
+        existing = conn.execute(
+            text("SELECT count(*) FROM cultural_items WHERE title LIKE :pattern"),
+            {"pattern": f"{BENCH_PREFIX}%"},
+        ).scalar()
+        missing = target - existing
+        if missing > 0:
+            print(f"Seeding {missing} synthetic items...")
+            conn.execute(SEED_SQL, {"prefix": BENCH_PREFIX, "count": missing})
+        conn.execute(text("ANALYZE cultural_items"))
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM cultural_items WHERE title LIKE :pattern"), {"pattern": f"{BENCH_PREFIX}%"})
+
+
+def ilike_statement(query: str):
+    """The pre-full-text search query, kept here for comparison"""
+    search = f"%{query}%"
+    return select(CulturalItem).where(
+        or_(
+            CulturalItem.title.ilike(search),
+            CulturalItem.description.ilike(search),
+            CulturalItem.region.ilike(search),
+            CulturalItem.time_period.ilike(search),
+            CulturalItem.historical_significance.ilike(search),
+        )
+    )
+
+
+def time_query(statement, runs: int) -> tuple[float, int]:
+    timings = []
+    rows = 0
+    for _ in range(runs):
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            rows = len(db.execute(statement).scalars().all())
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1_000_000, help="catalog size to benchmark against")
+    parser.add_argument("--runs", type=int, default=5, help="runs per query (median is reported)")
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--queries", default="amphora,jade mask,viking,funerary bronze,calligraphic",
+                        help="comma separated search queries")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic items afterwards")
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.items)
+    try:
+        # Unranked ILIKE can stop after the first `limit` hits, while ranking has
+        # to score every match, so the match count is reported alongside
+        print(f"{'query':<20} {'matches':>9} {'ilike ms':>10} {'fts ms':>10} {'speedup':>8}")
+        for query in [q.strip() for q in args.queries.split(",") if q.strip()]:
+            with SessionLocal() as db:
+                matches = db.execute(select(func.count()).where(search_condition(query))).scalar()
+            ilike_ms, _ = time_query(ilike_statement(query).limit(args.limit), args.runs)
+            fts_ms, _ = time_query(search_statement(query).limit(args.limit), args.runs)
+            print(f"{query:<20} {matches:>9} {ilike_ms:>10.1f} {fts_ms:>10.1f} {ilike_ms / fts_ms:>7.1f}x")
+    finally:
+        if not args.keep:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare ways of turning a page of cultural items into a JSON response body.
+
+Runs in memory, no database needed. From the backend directory:
+
+    python -m benchmarks.serialization --sizes 10 100 1000
+
+Each page is a list of transient CulturalItem ORM objects with three tags, as
+a list endpoint returns them. Measured per page:
+
+- response_model: what FastAPI does for a route with a response_model and the
+  default response class (cached TypeAdapter, validate, dump_json in Rust)
+- custom class + orjson: what any custom response class forces (validate,
+  dump_python to JSON-safe dicts, then orjson)
+- jsonable_encoder + json: the pure-Python encoding path
+- dict rendering: FastJSONResponse.render vs JSONResponse.render on the
+  already JSON-safe dicts, as for /metrics
+
+Every method must produce the same bytes, or the benchmark fails.
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.api.v1.core import schemas
+from app.api.v1.core.models import CulturalItem, Tag
+from app.serialization import FastJSONResponse, json_dumps
+
+adapter = TypeAdapter(List[schemas.CulturalItem])
+
+
+def make_page(size: int) -> List[CulturalItem]:
+    now = datetime.now(timezone.utc)
+    tags = [Tag(id=uuid.uuid4(), name=name) for name in ("bronze", "ritual", "Zhōu dynasty")]
+    return [
+        CulturalItem(
+            id=uuid.uuid4(),
+            title=f"Ritual vessel (dǐng) no. {n}",
+            description="Bronze vessel with taotie décor, cast in a piece-mould. " * 4,
+            time_period="Western Zhou",
+            region="Shaanxi",
+            image_url=f"https://example.com/images/{n}.jpg",
+            historical_significance="Used in ancestral rites; inscriptions record a royal gift.",
+            is_featured=n % 10 == 0,
+            view_count=n,
+            source="getty",
+            external_id=str(n),
+            created_at=now,
+            updated_at=now,
+            tags=tags,
+        )
+        for n in range(size)
+    ]
+
+
+def best_of(func: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="items per page")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement; the fastest counts")
+    args = parser.parse_args()
+
+    print(f"{'method':<28} {'items':>6} {'ms/page':>9} {'µs/item':>9}")
+    for size in args.sizes:
+        page = make_page(size)
+        content = adapter.dump_python(adapter.validate_python(page, from_attributes=True), mode="json")
+        methods = {
+            "response_model": lambda: adapter.dump_json(adapter.validate_python(page, from_attributes=True)),
+            "custom class + orjson": lambda: json_dumps(
+                adapter.dump_python(adapter.validate_python(page, from_attributes=True), mode="json")
+            ),
+            "jsonable_encoder + json": lambda: JSONResponse(None).render(
+                jsonable_encoder(adapter.validate_python(page, from_attributes=True))
+            ),
+            "dicts: JSONResponse": lambda: JSONResponse(None).render(content),
+            "dicts: FastJSONResponse": lambda: FastJSONResponse(None).render(content),
+        }
+        bodies = {name: method() for name, method in methods.items()}
+        if len(set(bodies.values())) != 1:
+            raise SystemExit(f"Methods disagree on the response body for {size} items")
+        for name, method in methods.items():
+            seconds = best_of(method, args.repeat)
+            print(f"{name:<28} {size:>6} {seconds * 1000:>9.2f} {seconds * 1e6 / size:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
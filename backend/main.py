@@ -2,6 +2,7 @@ import logging
 import signal
 import asyncio
 import os
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
@@ -10,8 +11,25 @@ from fastapi.staticfiles import StaticFiles  # Add this import
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from app.api.v1.routers import router
+from app.api.v1.core.migrations import SchemaUpgradeError
+from app.api.v1.core.pagination import page_totals
+from app.api.v1.core.services import (
+    random_item_sampler,
+    reconcile_blog_category_counts,
+    reconcile_source_counts,
+    reconcile_unread_counts,
+)
 from app.settings import settings
-from app.db_setup import init_db, is_db_connected
+from app.db_setup import async_engine, init_db, db_health
+from app.logging_config import configure_logging, new_request_id, request_id_var
+from app.instrumentation import check_query_count, route_template, track_queries
+from app.fanout import notification_fanout
+from app.ingest import ingest_jobs
+from app.jobs import PeriodicJob
+from app.image_processing import placeholder_service, shutdown_process_pool
+from app.response_cache import response_cache
+from app.security import password_hasher, token_cache
+from app.serialization import FastJSONResponse
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,11 +39,16 @@ if not os.getenv("DB_URL"):
     logging.error("DATABASE_URL environment variable is not set. Please check your .env file.")
     raise ValueError("DATABASE_URL environment variable is required but not set.")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure logging: JSON lines written off the request path by a queue listener
+configure_logging()
+request_logger = logging.getLogger("app.requests")
+
+# Database maintenance run in the background for the lifetime of the app
+background_jobs = [
+    PeriodicJob("reconcile_unread_counts", reconcile_unread_counts, settings.NOTIFICATION_COUNTER_RECONCILE_SECONDS),
+    PeriodicJob("reconcile_source_counts", reconcile_source_counts, settings.SOURCE_COUNT_RECONCILE_SECONDS),
+    PeriodicJob("reconcile_blog_category_counts", reconcile_blog_category_counts, settings.BLOG_CATEGORY_COUNT_RECONCILE_SECONDS),
+]
 
 def log_startup_config(app: FastAPI):
     """Log all routes for debugging purposes"""
@@ -42,16 +65,29 @@ async def lifespan(app: FastAPI):
     # Startup: initialize the database
     try:
         # Check DB connection before initializing
-        if not is_db_connected():
+        if not await asyncio.to_thread(db_health.check):
             logging.warning("Database connection failed - will retry on first request")
         else:
             init_db()
             logging.info("Database initialized successfully")
         
         log_startup_config(app)
+    except SchemaUpgradeError:
+        # The database is reachable but its schema could not be upgraded
+        raise
     except Exception as e:
         logging.error(f"Failed to initialize database: {str(e)}")
         # Don't re-raise the exception - this allows the app to start even with DB issues
+
+    # Keep checking the database in the background so requests can fail fast when it is down
+    db_health.start()
+    for job in background_jobs:
+        job.start()
+
+    try:
+        await placeholder_service.prerender(settings.PLACEHOLDER_PRERENDER_SIZES)
+    except Exception as e:
+        logging.error(f"Failed to pre-render placeholder images: {str(e)}")
     
     try:
         # Yield control to the application
@@ -64,6 +100,15 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown: cleanup resources if needed
         logging.info("Shutting down application")
+        for job in background_jobs:
+            await job.stop()
+        await db_health.stop()
+        await asyncio.to_thread(notification_fanout.shutdown)
+        await asyncio.to_thread(random_item_sampler.shutdown)
+        # A running ingest stops after its current batch and resumes from its checkpoint
+        await asyncio.to_thread(ingest_jobs.shutdown)
+        await async_engine.dispose()
+        shutdown_process_pool()
 
 # Create FastAPI app with enhanced error handling
 app = FastAPI(
@@ -95,13 +140,56 @@ app.openapi = custom_openapi
 @app.middleware("http")
 async def redirect_trailing_slash(request, call_next):
     # Skip API routes and documentation routes to prevent redirect loops
-    if request.url.path.startswith("/api/") or request.url.path in ["/docs", "/redoc", "/openapi.json"]:
+    if request.url.path.startswith("/api/") or request.url.path in ["/docs", "/redoc", "/openapi.json", "/health", "/metrics"]:
         return await call_next(request)
     
     if not request.url.path.endswith("/") and request.url.path != "/":
         return RedirectResponse(url=f"{request.url.path}/", status_code=307)
     return await call_next(request)
 
+# Record query count, DB time and the slowest statement of every request and
+# report them in a Server-Timing header and the request log. In assertion mode
+# (tests) fail requests that exceed QUERY_COUNT_ASSERT_LIMIT, so N+1
+# regressions surface immediately
+@app.middleware("http")
+async def instrument_requests(request, call_next):
+    started = time.perf_counter()
+    with track_queries(
+        f"{request.method} {request.url.path}", keep_statements=bool(settings.QUERY_COUNT_ASSERT_LIMIT)
+    ) as stats:
+        response = await call_next(request)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # Tag with the route template rather than the concrete path once routing is done
+    stats.route = route_template(request.method, request.scope)
+    response.headers["Server-Timing"] = f"{stats.server_timing()}, app;dur={elapsed_ms:.1f}"
+    request_logger.info(
+        f"{stats.route} {response.status_code} {elapsed_ms:.1f}ms "
+        f"queries={stats.count} db={stats.total_seconds * 1000:.1f}ms",
+        extra={
+            **stats.log_fields(),
+            "status_code": response.status_code,
+            "duration_ms": round(elapsed_ms, 2),
+            "db_slowest_statement": stats.slowest_statement,
+        },
+    )
+    if settings.QUERY_COUNT_ASSERT_LIMIT:
+        response.headers["X-Query-Count"] = str(stats.count)
+        check_query_count(stats, settings.QUERY_COUNT_ASSERT_LIMIT)
+    return response
+
+# Tag every log line of a request with its id; registered after the middleware
+# above so it wraps them and their log lines carry the id too
+@app.middleware("http")
+async def assign_request_id(request, call_next):
+    request_id = new_request_id(request.headers.get("x-request-id"))
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Create static directory if it doesn't exist
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 if not os.path.exists(static_dir):
@@ -127,7 +215,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Type", "Authorization"],
+    expose_headers=["Content-Type", "Authorization", "X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated", "ETag", "Server-Timing", "X-Request-ID"],
 )
 
 # Add middleware to handle preflight requests
@@ -147,10 +235,31 @@ async def handle_options(request, call_next):
         )
     return await call_next(request)
 
-@app.get("/")
+@app.get("/", response_class=FastJSONResponse)
 def root():
     return {"message": "Welcome to the Cultural Heritage Platform API"}
 
+@app.get("/health", response_class=FastJSONResponse)
+def health():
+    """Report database health from the background monitor without touching the database"""
+    db_status = db_health.status()
+    status_code = 503 if db_status["circuit_open"] else 200
+    return FastJSONResponse(status_code=status_code, content={"database": db_status})
+
+@app.get("/metrics", response_class=FastJSONResponse)
+def metrics():
+    """In-process runtime metrics"""
+    return {
+        "password_hashing": password_hasher.metrics(),
+        "token_cache": token_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "placeholder_cache": placeholder_service.stats(),
+        "random_sample_pools": random_item_sampler.stats(),
+        "page_totals": page_totals.stats(),
+        "notification_fanout": notification_fanout.metrics(),
+        "ingest_jobs": ingest_jobs.metrics(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
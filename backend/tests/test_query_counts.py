@@ -0,0 +1,90 @@
+"""Query budgets of the cultural item routes, so N+1 regressions fail here.
+
+Needs a scratch PostgreSQL database in DB_URL. From the backend directory:
+
+    python -m pytest tests
+"""
+import os
+import uuid
+
+import pytest
+
+if not os.getenv("DB_URL"):
+    pytest.skip("needs a PostgreSQL database in DB_URL", allow_module_level=True)
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.api.v1.core.models import CulturalItem, Media, Tag, cultural_item_tag
+from app.api.v1.core.services import get_cultural_item_detail, get_cultural_items_page
+from app.db_setup import SessionLocal, init_db
+from app.instrumentation import assert_max_queries
+from app.response_cache import response_cache
+from app.settings import settings
+from main import app
+
+ITEMS = 25
+
+
+@pytest.fixture(scope="module")
+def seeded_items():
+    """ITEMS new items with two tags and two media files each; removed afterwards"""
+    init_db()
+    suffix = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        tags = [Tag(name=f"qc-{name}-{suffix}") for name in ("bronze", "ritual")]
+        items = [
+            CulturalItem(
+                title=f"Query count item {n}",
+                tags=tags,
+                media=[Media(url=f"https://example.com/{suffix}/{n}/{m}.jpg", media_type="image") for m in range(2)],
+            )
+            for n in range(ITEMS)
+        ]
+        db.add_all(items)
+        db.commit()
+        item_ids = [item.id for item in items]
+        tag_ids = [tag.id for tag in tags]
+    yield item_ids
+    with SessionLocal() as db:
+        db.execute(delete(cultural_item_tag).where(cultural_item_tag.c.cultural_item_id.in_(item_ids)))
+        db.execute(delete(Media).where(Media.cultural_item_id.in_(item_ids)))
+        db.execute(delete(CulturalItem).where(CulturalItem.id.in_(item_ids)))
+        db.execute(delete(Tag).where(Tag.id.in_(tag_ids)))
+        db.commit()
+    response_cache.clear()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Every request fails with a 500 once it runs more statements than this
+    monkeypatch.setattr(settings, "QUERY_COUNT_ASSERT_LIMIT", 5)
+    response_cache.clear()
+    with TestClient(app) as client:
+        yield client
+
+
+def test_item_page_query_budget(seeded_items):
+    with SessionLocal() as db, assert_max_queries(2):
+        items, _ = get_cultural_items_page(db, limit=ITEMS)
+        assert all(len(item.tags) == 2 for item in items)
+
+
+def test_item_detail_query_budget(seeded_items):
+    with SessionLocal() as db, assert_max_queries(2):
+        item = get_cultural_item_detail(db, seeded_items[0])
+        assert len(item.tags) == 2 and len(item.media) == 2
+
+
+def test_item_list_route_query_count(seeded_items, client):
+    response = client.get("/api/v1/cultural-items/", params={"limit": ITEMS})
+    assert response.status_code == 200
+    assert len(response.json()) == ITEMS
+    assert int(response.headers["X-Query-Count"]) <= 3
+
+
+def test_item_detail_route_query_count(seeded_items, client):
+    response = client.get(f"/api/v1/cultural-items/{seeded_items[0]}")
+    assert response.status_code == 200
+    assert len(response.json()["media"]) == 2
+    assert int(response.headers["X-Query-Count"]) <= 2
@@ -284,7 +284,7 @@ const Navigation = () => {
                     <div className="h-9 w-9 rounded-full bg-indigo-600 flex items-center justify-center text-white font-medium overflow-hidden">
                       {user?.profile_image ? (
                         <img 
-                          src={user.profile_image} 
+                          src={user.profile_image_variants?.['64']?.webp || user.profile_image} 
                           alt={user?.username || 'Profile'}
                           className="h-full w-full object-cover"
                           onError={(e) => {
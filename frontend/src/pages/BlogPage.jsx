@@ -172,7 +172,8 @@ const BlogPage = () => {
         const processedPosts = posts.map(post => ({
           id: post.id,
           title: post.title || 'Untitled Post',
-          content: post.content || post.body || post.description || 'No content available',
+          // The list API sends a precomputed excerpt instead of the full content
+          excerpt: post.excerpt || `${(post.content || post.body || post.description || 'No content available').substring(0, 150)}...`,
           created_at: post.created_at || post.createdAt || post.date || new Date().toISOString(),
           category: post.category || { 
             id: post.category_id || 'uncategorized', 
@@ -324,7 +325,7 @@ const BlogPage = () => {
                         {post.title}
                       </h2>
                       <p className="text-gray-600 mb-4 line-clamp-3">
-                        {post.content.substring(0, 150)}...
+                        {post.excerpt}
                       </p>
                       <div className="flex items-center text-sm">
                         <div className="flex items-center text-gray-500">